@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from .authentication import user_changed
+
+        post_save.connect(user_changed, sender=settings.AUTH_USER_MODEL)
+        post_delete.connect(user_changed, sender=settings.AUTH_USER_MODEL)
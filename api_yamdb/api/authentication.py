@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from reviews.generations import get_generations
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация с кэшированием пользователя.
+
+    Пользователь читается из базы один раз за USER_CACHE_TIMEOUT секунд;
+    изменение и удаление пользователя сбрасывают его запись в кэше.
+    Запись хранится вместе с эпохой поколений, поэтому массовая загрузка
+    и flush, идущие мимо сигналов, тоже делают её недействительной.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            )
+        key = user_cache_key(user_id)
+        epoch = get_generations(())[0]
+        entry = cache.get(key)
+        if entry is not None and entry[0] == epoch:
+            return entry[1]
+        user = super().get_user(validated_token)
+        cache.set(key, (epoch, user), settings.USER_CACHE_TIMEOUT)
+        return user
+
+
+def user_changed(sender, instance, **kwargs):
+    # Сброс после фиксации: иначе параллельный запрос мог бы закэшировать
+    # ещё не изменённую строку.
+    key = user_cache_key(getattr(instance, api_settings.USER_ID_FIELD))
+    transaction.on_commit(lambda: cache.delete(key))
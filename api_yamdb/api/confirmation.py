@@ -0,0 +1,75 @@
+import secrets
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+from reviews.models import UsedConfirmationCode
+
+KEY_SALT = "api.confirmation.code"
+SIGNATURE_LENGTH = 20
+
+
+def signature(user, timestamp, nonce):
+    value = f"{user.pk}:{user.username}:{user.email}:{timestamp}:{nonce}"
+    return salted_hmac(
+        KEY_SALT, value, algorithm="sha256"
+    ).hexdigest()[:SIGNATURE_LENGTH]
+
+
+def make_confirmation_code(user):
+    """Подписанный код подтверждения с временем выдачи.
+
+    Код проверяется по подписи и не хранится в базе, поэтому регистрация
+    не обновляет строку пользователя.
+    """
+    timestamp = int_to_base36(int(time.time()))
+    nonce = int_to_base36(secrets.randbits(32))
+    return f"{timestamp}-{nonce}-{signature(user, timestamp, nonce)}"
+
+
+def check_confirmation_code(user, code):
+    """Проверка подписи и срока действия кода.
+
+    При CONFIRMATION_CODE_SINGLE_USE подпись кода после успешной проверки
+    записывается в таблицу использованных кодов до истечения срока
+    действия, и повторно он не принимается.
+    """
+    try:
+        timestamp, nonce, code_signature = str(code).split("-")
+        issued = base36_to_int(timestamp)
+    except ValueError:
+        return False
+    if not constant_time_compare(
+        code_signature, signature(user, timestamp, nonce)
+    ):
+        return False
+    remaining = issued + settings.CONFIRMATION_CODE_TIMEOUT - time.time()
+    if remaining <= 0:
+        return False
+    if settings.CONFIRMATION_CODE_SINGLE_USE:
+        return mark_used(code_signature, remaining)
+    return True
+
+
+def mark_used(code_signature, remaining):
+    """Запись подписи кода; False, если код уже использован.
+
+    Из двух одновременных проверок одного кода вставку выполнит только
+    одна, вторая упрётся в первичный ключ. Записи с истёкшим сроком
+    удаляются здесь же.
+    """
+    now = timezone.now()
+    UsedConfirmationCode.objects.filter(expires__lte=now).delete()
+    try:
+        with transaction.atomic():
+            UsedConfirmationCode.objects.create(
+                signature=code_signature,
+                expires=now + timedelta(seconds=remaining),
+            )
+    except IntegrityError:
+        return False
+    return True
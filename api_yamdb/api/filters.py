@@ -1,15 +1,91 @@
-from django_filters.rest_framework import CharFilter, FilterSet, NumberFilter
-from reviews.models import Title
+from django.db.models import F
+from django_filters.constants import EMPTY_VALUES
+from django_filters.rest_framework import (CharFilter, FilterSet,
+                                           NumberFilter, OrderingFilter)
+from reviews.models import Comment, Review, Title
+from reviews.search import search_texts, search_titles
+
+
+class StableOrderingFilter(OrderingFilter):
+    """Сортировка с добавкой id в направлении первого ключа.
+
+    Записи с одинаковым ключом не переходят между страницами, а порядок
+    (ключ, id) совпадает с индексами произведений. NULL в ключе меньше
+    любого значения на всех базах: по возрастанию такие записи идут
+    первыми, по убыванию — последними.
+    """
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        ordering = [self.get_ordering_value(param) for param in value]
+        tiebreak = "-id" if ordering[0].startswith("-") else "id"
+        return qs.order_by(
+            *(self.order_key(qs.model, key) for key in ordering), tiebreak
+        )
+
+    @staticmethod
+    def order_key(model, key):
+        name = key.lstrip("-")
+        if not model._meta.get_field(name).null:
+            return key
+        if key.startswith("-"):
+            return F(name).desc(nulls_last=True)
+        return F(name).asc(nulls_first=True)
 
 
 class TitleFilter(FilterSet):
     """Фильтрация произведений."""
 
-    name = CharFilter(field_name="name", lookup_expr="contains")
+    name = CharFilter(method="filter_name")
     year = NumberFilter(field_name="year")
     category = CharFilter(field_name="category__slug")
     genre = CharFilter(field_name="genre__slug")
+    ordering = StableOrderingFilter(
+        fields=(
+            ("name", "name"),
+            ("year", "year"),
+            ("rating", "rating"),
+            ("rating_count", "review_count"),
+        )
+    )
 
     class Meta:
         model = Title
         fields = ("name", "year", "category", "genre")
+
+    def filter_name(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class TextSearchFilter(FilterSet):
+    """Полнотекстовый поиск по текстам отзывов и комментариев."""
+
+    q = CharFilter(method="search", required=True)
+    author = CharFilter(field_name="author__username")
+
+    def search(self, queryset, name, value):
+        return search_texts(queryset, value)
+
+
+class ReviewSearchFilter(TextSearchFilter):
+    """Поиск отзывов с фильтрацией по произведению, автору и оценке."""
+
+    title = NumberFilter(field_name="title")
+    score_min = NumberFilter(field_name="score", lookup_expr="gte")
+    score_max = NumberFilter(field_name="score", lookup_expr="lte")
+
+    class Meta:
+        model = Review
+        fields = ("q", "title", "author", "score_min", "score_max")
+
+
+class CommentSearchFilter(TextSearchFilter):
+    """Поиск комментариев с фильтрацией по произведению, отзыву и автору."""
+
+    title = NumberFilter(field_name="review__title")
+    review = NumberFilter(field_name="review")
+
+    class Meta:
+        model = Comment
+        fields = ("q", "title", "review", "author")
@@ -1,4 +1,13 @@
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import mixins, viewsets
+from rest_framework.response import Response
+from reviews.generations import get_generations
 
 
 class CLDViewSet(
@@ -10,3 +19,98 @@ class CLDViewSet(
     """Миксин модель для Жанров и Категорий."""
 
     pass
+
+
+class ListViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Миксин модель только для получения списка."""
+
+    pass
+
+
+def request_fingerprint(request):
+    """Адрес запроса с упорядоченными параметрами."""
+    query = urlencode(sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    ))
+    url = f"{request.get_host()}{request.path}?{query}"
+    return md5(url.encode()).hexdigest()
+
+
+class GenerationsMixin:
+    """Миксин поколений моделей, от которых зависит ответ."""
+
+    cache_models = ()
+
+    def get_generation_scopes(self):
+        """Пары (модель, область) поколений, от которых зависит ответ."""
+        return [(model, None) for model in self.cache_models]
+
+    def get_generations(self):
+        generations = getattr(self, "_generations", None)
+        if generations is None:
+            generations = self._generations = get_generations(
+                self.get_generation_scopes()
+            )
+        return generations
+
+
+class CachedListMixin(GenerationsMixin):
+    """Миксин кэширования ответов list по поколениям моделей.
+
+    Ключ состоит из адреса запроса и текущих поколений моделей из
+    cache_models; любая запись в эти модели меняет поколение, и прежние
+    страницы больше не читаются.
+    """
+
+    def list_cache_key(self, request):
+        generations = ":".join(map(str, self.get_generations()))
+        return (
+            f"list:{self.basename}:{generations}:"
+            f"{request_fingerprint(request)}"
+        )
+
+    def list(self, request, *args, **kwargs):
+        key = self.list_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, settings.LIST_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalGetMixin(GenerationsMixin):
+    """Миксин условных GET-запросов для list и retrieve.
+
+    ETag строится из адреса запроса и поколений моделей, Last-Modified —
+    время последнего из них, поэтому совпадающий If-None-Match или
+    If-Modified-Since получает 304 без запросов к базе и сериализации.
+    """
+
+    def get_validators(self, request):
+        generations = self.get_generations()
+        etag = quote_etag(md5(
+            f"{request_fingerprint(request)}:"
+            f"{':'.join(map(str, generations))}".encode()
+        ).hexdigest())
+        return etag, max(generations) // 10 ** 9
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
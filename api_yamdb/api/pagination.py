@@ -0,0 +1,131 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, LimitOffsetPagination,
+                                       _positive_int)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Курсорная пагинация по ключу (pub_date, id).
+
+    Следующая страница выбирается условием по ключу последней записи, а не
+    смещением, поэтому её стоимость не зависит от глубины прокрутки и не
+    требует COUNT(*).
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    max_limit = 100
+    invalid_cursor_message = "Invalid cursor"
+    descending = False
+
+    def __init__(self, default_limit):
+        self.default_limit = default_limit
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        direction = "-" if self.descending else ""
+        queryset = queryset.order_by(f"{direction}pub_date", f"{direction}id")
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            pub_date, pk = cursor
+            lookup = "lt" if self.descending else "gt"
+            # Избыточное условие по pub_date даёт базе диапазон индекса,
+            # OR уточняет порядок внутри одной отметки времени.
+            queryset = queryset.filter(
+                Q(**{f"pub_date__{lookup}e": pub_date}),
+                Q(**{f"pub_date__{lookup}": pub_date})
+                | Q(pub_date=pub_date, **{f"id__{lookup}": pk}),
+            )
+        page = list(queryset[:self.limit + 1])
+        self.has_next = len(page) > self.limit
+        page = page[:self.limit]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True,
+                cutoff=self.max_limit,
+            )
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            pub_date, pk = urlsafe_b64decode(
+                encoded.encode("ascii")
+            ).decode("ascii").split("|")
+            pub_date, pk = parse_datetime(pub_date), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
+
+    def encode_cursor(self, obj):
+        token = f"{obj.pub_date.isoformat()}|{obj.pk}"
+        return urlsafe_b64encode(token.encode("ascii")).decode("ascii")
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.last),
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", None),
+            ("results", data),
+        ]))
+
+
+class FeedPagination(LimitOffsetPagination):
+    """Пагинация лент отзывов и комментариев.
+
+    Без параметра cursor сохраняется прежний контракт limit/offset; запрос
+    с cursor (для первой страницы — пустым) переключает ленту на курсорную
+    пагинацию по (pub_date, id).
+    """
+
+    descending = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination(self.default_limit)
+            self.keyset.descending = self.descending
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class ReviewPagination(FeedPagination):
+    """Пагинация отзывов: новые сначала."""
+
+    descending = True
+
+
+class CommentPagination(FeedPagination):
+    """Пагинация комментариев: в порядке публикации."""
+
+    descending = False
@@ -1,10 +1,12 @@
-from django.db.models import Avg
-from django.shortcuts import get_object_or_404
+from django.conf import settings
 from rest_framework import serializers
 from rest_framework.relations import SlugRelatedField
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.autocomplete import KINDS
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleStats, User)
+from reviews.search import render_highlight
 
-from .validators import validate_email, validate_title_year, validate_username
+from .validators import validate_title_year, validate_username
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -28,7 +30,7 @@ class SignUpSerializer(serializers.ModelSerializer):
     username = serializers.RegexField(
         max_length=150, regex=r"^[\w.@+-]", validators=[validate_username]
     )
-    email = serializers.EmailField(max_length=254, validators=[validate_email])
+    email = serializers.EmailField(max_length=254)
 
     class Meta:
         model = User
@@ -46,6 +48,26 @@ class ObtainTokenSerializer(serializers.ModelSerializer):
         fields = ("username", "confirmation_code")
 
 
+class AutocompleteSerializer(serializers.Serializer):
+    """Сериализатор параметров подсказок по префиксу."""
+
+    q = serializers.CharField(max_length=256, trim_whitespace=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    type = serializers.ChoiceField(
+        choices=tuple(KINDS.values()), required=False
+    )
+
+
+class TopTitlesSerializer(serializers.Serializer):
+    """Сериализатор параметров рейтинга лучших произведений."""
+
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.TOP_TITLES_DEPTH, default=10
+    )
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор Категорий."""
 
@@ -67,13 +89,9 @@ class GenreSerializer(serializers.ModelSerializer):
 class TitleSerializer(serializers.ModelSerializer):
     """Сериализатор Произведений основной."""
 
-    rating = serializers.SerializerMethodField()
+    rating = serializers.FloatField(read_only=True)
     year = serializers.IntegerField(validators=[validate_title_year])
 
-    def get_rating(self, obj):
-        rating = obj.reviews.aggregate(Avg("score", default=0))
-        return rating.get("score__avg")
-
     class Meta:
         model = Title
         fields = (
@@ -94,6 +112,17 @@ class TitleReadSerializer(TitleSerializer):
     category = CategorySerializer(read_only=True)
 
 
+class RankedTitleSerializer(TitleReadSerializer):
+    """Сериализатор Произведений в рейтинге лучших."""
+
+    position = serializers.IntegerField(read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = (
+            "position", "weighted_rating"
+        ) + TitleReadSerializer.Meta.fields
+
+
 class TitleWriteSerializer(TitleSerializer):
     """Сериализатор Произведений запись."""
 
@@ -105,6 +134,22 @@ class TitleWriteSerializer(TitleSerializer):
     )
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор распределения оценок произведения."""
+
+    count = serializers.IntegerField(read_only=True)
+    mean = serializers.FloatField(read_only=True)
+    median = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    class Meta:
+        model = TitleStats
+        fields = ("title", "count", "mean", "median", "histogram")
+        read_only_fields = ("title",)
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатор Отзывов."""
 
@@ -115,19 +160,6 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
     title = SlugRelatedField(slug_field="name", read_only=True)
 
-    def validate(self, data):
-        request = self.context["request"]
-        title_id = self.context["view"].kwargs.get("title_id")
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == "POST":
-            if Review.objects.filter(
-                title=title, author=request.user
-            ).exists():
-                raise serializers.ValidationError(
-                    "Допустимо не более 1 отзыва на произведение"
-                )
-        return data
-
     class Meta:
         model = Review
         fields = ("id", "title", "text", "author", "score", "pub_date")
@@ -145,3 +177,30 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ("id", "text", "author", "pub_date", "review")
         read_only_fields = ("review",)
+
+
+class HighlightField(serializers.CharField):
+    """Фрагмент найденного текста как HTML с подсветкой."""
+
+    def to_representation(self, value):
+        return render_highlight(value)
+
+
+class ReviewSearchSerializer(ReviewSerializer):
+    """Сериализатор найденных отзывов."""
+
+    relevance = serializers.FloatField(read_only=True)
+    highlight = HighlightField(read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ("relevance", "highlight")
+
+
+class CommentSearchSerializer(CommentSerializer):
+    """Сериализатор найденных комментариев."""
+
+    relevance = serializers.FloatField(read_only=True)
+    highlight = HighlightField(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ("relevance", "highlight")
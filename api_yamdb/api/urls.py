@@ -1,6 +1,7 @@
-from api.views import (CategorytViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, TitleViewSet, UserViewSet, obtain_token,
-                       sign_up)
+from api.views import (CategorytViewSet, CommentSearchViewSet,
+                       CommentViewSet, GenreViewSet, ReviewSearchViewSet,
+                       ReviewViewSet, TitleViewSet, UserViewSet, autocomplete,
+                       obtain_token, sign_up)
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
@@ -19,9 +20,16 @@ router.register(
     basename="reviews",
 )
 router.register("users", UserViewSet, basename="users")
+router.register(
+    "search/reviews", ReviewSearchViewSet, basename="search-reviews"
+)
+router.register(
+    "search/comments", CommentSearchViewSet, basename="search-comments"
+)
 
 urlpatterns = [
     path("v1/", include(router.urls)),
     path("v1/auth/signup/", sign_up),
     path("v1/auth/token/", obtain_token),
+    path("v1/autocomplete/", autocomplete),
 ]
@@ -1,25 +1,31 @@
 import datetime
 
 from rest_framework.exceptions import ValidationError
-from reviews.models import User
 
 
 def validate_username(value):
     """Валидатор имени пользователя."""
     if value == "me":
         raise ValidationError("Недопустимое имя пользователя!")
-    elif User.objects.filter(username=value).exists():
-        raise ValidationError(
-            "Пользователь с таким именем уже зарегистрирован"
-        )
 
 
-def validate_email(value):
-    """Валидатор почты пользователя."""
-    if User.objects.filter(email=value).exists():
-        raise ValidationError(
-            "Пользователь с такой почтой уже зарегистрирован"
-        )
+def signup_conflicts(users, username, email):
+    """Ошибки регистрации для уже найденных пользователей.
+
+    users — пользователи с тем же именем или той же почтой; уникальность
+    проверяется одним запросом в sign_up, а не отдельно для каждого поля.
+    """
+    errors = {}
+    for user in users:
+        if user.username == username:
+            errors["username"] = [
+                "Пользователь с таким именем уже зарегистрирован"
+            ]
+        if user.email == email:
+            errors["email"] = [
+                "Пользователь с такой почтой уже зарегистрирован"
+            ]
+    return errors
 
 
 def validate_title_year(value):
@@ -1,24 +1,38 @@
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, Q
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.autocomplete import autocomplete_index
+from reviews.bloom import user_filter
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRank, TitleStats, User)
+from reviews.outbox import enqueue_email
+from reviews.ratings import (rebuild_title_ratings, update_title_rating,
+                             update_title_stats)
 
 from api_yamdb.settings import EMAIL
 
-from .filters import TitleFilter
-from .mixins import CLDViewSet
+from .confirmation import check_confirmation_code, make_confirmation_code
+from .filters import CommentSearchFilter, ReviewSearchFilter, TitleFilter
+from .mixins import (CachedListMixin, CLDViewSet, ConditionalGetMixin,
+                     ListViewSet)
+from .pagination import CommentPagination, ReviewPagination
 from .permissions import CGTPermissions, RCPermissions, UPermissions
-from .serializers import (CategorySerializer, CommentSerializer,
+from .serializers import (AutocompleteSerializer, CategorySerializer,
+                          CommentSearchSerializer, CommentSerializer,
                           GenreSerializer, ObtainTokenSerializer,
+                          RankedTitleSerializer, ReviewSearchSerializer,
                           ReviewSerializer, SignUpSerializer,
-                          TitleReadSerializer, TitleWriteSerializer,
+                          TitleReadSerializer, TitleStatsSerializer,
+                          TitleWriteSerializer, TopTitlesSerializer,
                           UserSerializer)
+from .validators import signup_conflicts
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -51,44 +65,66 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer.save(role=request.user.role)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            title_ids = list(instance.reviews.values_list("title", flat=True))
+            instance.delete()
+            rebuild_title_ratings(title_ids)
+
+
+def create_signup_user(serializer):
+    """Создание пользователя; None, если имя или почта уже заняты."""
+    try:
+        with transaction.atomic():
+            return serializer.save()
+    except IntegrityError:
+        return None
+
+
+def send_confirmation_code(user, text):
+    enqueue_email(
+        "Код подтверждения",
+        f"Здравствуйте! {text}: {make_confirmation_code(user)}",
+        user.email,
+        EMAIL,
+    )
+
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def sign_up(request):
     """Функция добавления нового пользователя."""
     serializer = SignUpSerializer(data=request.data)
-    if User.objects.filter(
-        username=request.data.get("username"), email=request.data.get("email")
-    ).exists():
-        user, created = User.objects.get_or_create(
-            username=request.data.get("username")
-        )
-        confirmation_code = default_token_generator.make_token(user)
-        user.confirmation_code = confirmation_code
-        user.save()
-        send_mail(
-            "Код подтверждения",
-            f"Здравствуйте! Новый код подтверждения: {confirmation_code}",
-            EMAIL,
-            [f"{request.data.get('email')}"],
-            fail_silently=False,
-        )
-        return Response("Код подтверждения обновлён",
-                        status=status.HTTP_200_OK)
     serializer.is_valid(raise_exception=True)
-    serializer.save()
-    user = User.objects.get(
-        username=request.data.get("username"), email=request.data.get("email")
-    )
-    confirmation_code = default_token_generator.make_token(user)
-    user.confirmation_code = confirmation_code
-    send_mail(
-        "Код подтверждения",
-        f"Здравствуйте! Ваш код подтверждения: {confirmation_code}",
-        EMAIL,
-        [f"{request.data.get('email')}"],
-        fail_silently=False,
-    )
+    username = serializer.validated_data["username"]
+    email = serializer.validated_data["email"]
+    user = None
+    if not user_filter.may_exist(username, email):
+        # Имя и почта точно свободны, проверка по базе не нужна. Если
+        # фильтр отстал от другого процесса, уникальные ограничения
+        # вернут регистрацию к обычному пути.
+        user = create_signup_user(serializer)
+    if user is None:
+        # Один запрос по обоим уникальным индексам решает, новый ли это
+        # пользователь, повторный запрос кода или занятые имя и почта.
+        users = list(
+            User.objects.filter(Q(username=username) | Q(email=email))[:2]
+        )
+        for user in users:
+            if user.username == username and user.email == email:
+                send_confirmation_code(user, "Новый код подтверждения")
+                return Response("Код подтверждения обновлён",
+                                status=status.HTTP_200_OK)
+        errors = signup_conflicts(users, username, email)
+        if errors:
+            raise ValidationError(errors)
+        user = create_signup_user(serializer)
+        if user is None:
+            # Параллельная регистрация успела занять имя или почту.
+            raise ValidationError(
+                "Пользователь с таким именем или почтой уже зарегистрирован"
+            )
+    send_confirmation_code(user, "Ваш код подтверждения")
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -101,7 +137,7 @@ def obtain_token(request):
     username = serializer.validated_data.get("username")
     confirmation_code = serializer.validated_data.get("confirmation_code")
     user = get_object_or_404(User, username=username)
-    if not default_token_generator.check_token(user, confirmation_code):
+    if not check_confirmation_code(user, confirmation_code):
         return Response("Неверный код подтверждения",
                         status=status.HTTP_400_BAD_REQUEST)
     token = AccessToken.for_user(user)
@@ -110,10 +146,26 @@ def obtain_token(request):
     )
 
 
-class CategorytViewSet(CLDViewSet):
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def autocomplete(request):
+    """Подсказки названий произведений, жанров и категорий по префиксу."""
+    serializer = AutocompleteSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    kind = serializer.validated_data.get("type")
+    results = autocomplete_index.search(
+        serializer.validated_data["q"],
+        serializer.validated_data["limit"],
+        kinds=(kind,) if kind else None,
+    )
+    return Response(results, status=status.HTTP_200_OK)
+
+
+class CategorytViewSet(CachedListMixin, CLDViewSet):
     """ViewSet модели Категорий."""
 
     queryset = Category.objects.all()
+    cache_models = (Category,)
     serializer_class = CategorySerializer
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
@@ -124,10 +176,11 @@ class CategorytViewSet(CLDViewSet):
         return get_object_or_404(self.queryset, slug=self.kwargs["slug"])
 
 
-class GenreViewSet(CLDViewSet):
+class GenreViewSet(CachedListMixin, CLDViewSet):
     """ViewSet модели Жанров."""
 
     queryset = Genre.objects.all()
+    cache_models = (Genre,)
     serializer_class = GenreSerializer
     filter_backends = (filters.SearchFilter, DjangoFilterBackend)
     search_fields = ("name",)
@@ -140,10 +193,16 @@ class GenreViewSet(CLDViewSet):
         return get_object_or_404(self.queryset, slug=self.kwargs["slug"])
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin, CachedListMixin, viewsets.ModelViewSet
+):
     """ViewSet модели Произведений."""
 
-    queryset = Title.objects.all()
+    queryset = Title.objects.select_related("category").prefetch_related(
+        Prefetch("genre")
+    )
+    # Рейтинг в ответе меняется вместе с отзывами.
+    cache_models = (Title, Genre, Category, Review)
     serializer_class = TitleReadSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
@@ -154,33 +213,184 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    def get_generation_scopes(self):
+        if self.action == "retrieve":
+            # Рейтинг одного произведения зависит только от его отзывов.
+            return [
+                (Title, None), (Genre, None), (Category, None),
+                (Review, self.kwargs.get("pk")),
+            ]
+        return super().get_generation_scopes()
+
+    @action(methods=["get"], detail=False)
+    def top(self, request):
+        """Лучшие произведения по взвешенному рейтингу."""
+        serializer = TopTitlesSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        category = serializer.validated_data.get("category")
+        genre = serializer.validated_data.get("genre")
+        # Места заранее посчитаны командой rank_titles.
+        ranks = TitleRank.objects.filter(
+            Q(category__slug=category) if category else Q(category=None),
+            Q(genre__slug=genre) if genre else Q(genre=None),
+        ).select_related("title__category").prefetch_related(
+            "title__genre"
+        )[:serializer.validated_data["limit"]]
+        titles = []
+        for rank in ranks:
+            rank.title.position = rank.position
+            titles.append(rank.title)
+        return Response(RankedTitleSerializer(titles, many=True).data)
+
+    @action(methods=["get"], detail=True)
+    def stats(self, request, pk=None):
+        """Число, среднее, медиана и распределение оценок произведения."""
+        title = get_object_or_404(
+            Title.objects.select_related("stats"), pk=pk
+        )
+        try:
+            stats = title.stats
+        except TitleStats.DoesNotExist:
+            stats = TitleStats(title=title)
+        return Response(TitleStatsSerializer(stats).data)
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet модели Отзывов."""
 
     serializer_class = ReviewSerializer
     permission_classes = (RCPermissions,)
+    pagination_class = ReviewPagination
+
+    def get_generation_scopes(self):
+        # В ответе есть название произведения и имя автора.
+        return [
+            (Review, self.kwargs.get("title_id")), (Title, None), (User, None)
+        ]
+
+    def get_title(self):
+        """Произведение из адреса, загружается один раз за запрос."""
+        title = getattr(self, "_title", None)
+        if title is None:
+            title = self._title = get_object_or_404(
+                Title, id=self.kwargs.get("title_id")
+            )
+        return title
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get("title_id"))
-        return title.reviews.all()
+        if self.detail:
+            # Отзыв ищется сразу с условием на произведение, без отдельной
+            # загрузки произведения.
+            return Review.objects.filter(
+                title_id=self.kwargs.get("title_id")
+            ).select_related("title", "author")
+        # Произведение у всех отзывов страницы одно и уже загружено, от
+        # автора нужно только имя.
+        return self.get_title().reviews.select_related("author").only(
+            "id", "title", "text", "score", "pub_date", "author__username"
+        )
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get("title_id")
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(title=title, author=self.request.user)
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        title = self.get_title()
+        author = self.request.user
+        with transaction.atomic():
+            # Повторный отзыв отсекает ограничение unique_review, а не
+            # предварительная проверка. Точка сохранения охватывает только
+            # вставку, и прочие ошибки целостности не выдаются за повтор.
+            try:
+                with transaction.atomic():
+                    review = serializer.save(title=title, author=author)
+            except IntegrityError:
+                if not Review.objects.filter(
+                    title=title, author=author
+                ).exists():
+                    raise
+                raise ValidationError(
+                    "Допустимо не более 1 отзыва на произведение"
+                )
+            update_title_rating(title.id, review.score, 1)
+            update_title_stats(title.id, added=review.score)
+
+    def locked_score(self, review):
+        """Оценка отзыва из базы под блокировкой строки."""
+        # Параллельные изменения того же отзыва ждут конца транзакции:
+        # разница оценок считается от сохранённого значения.
+        score = Review.objects.select_for_update().filter(
+            pk=review.pk
+        ).values_list("score", flat=True).first()
+        if score is None:
+            raise NotFound
+        return score
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            old_score = self.locked_score(serializer.instance)
+            review = serializer.save()
+            update_title_rating(review.title_id, review.score - old_score)
+            update_title_stats(
+                review.title_id, added=review.score, removed=old_score
+            )
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            score = self.locked_score(instance)
+            _, deleted = instance.delete()
+            # Рейтинг меняется, только если отзыв удалён этим запросом.
+            if deleted.get(Review._meta.label):
+                update_title_rating(instance.title_id, -score, -1)
+                update_title_stats(instance.title_id, removed=score)
+
+
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet модели Комментариев к отзывам."""
 
     serializer_class = CommentSerializer
     permission_classes = (RCPermissions,)
+    pagination_class = CommentPagination
+
+    def get_generation_scopes(self):
+        return [(Comment, self.kwargs.get("review_id")), (User, None)]
+
+    def get_review(self):
+        """Отзыв из адреса, загружается один раз за запрос."""
+        review = getattr(self, "_review", None)
+        if review is None:
+            review = self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id"),
+            )
+        return review
 
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs.get("review_id"))
-        return review.comments.all()
+        if self.detail:
+            return Comment.objects.filter(
+                review_id=self.kwargs.get("review_id"),
+                review__title_id=self.kwargs.get("title_id"),
+            ).select_related("author")
+        return self.get_review().comments.select_related("author").only(
+            "id", "review", "text", "pub_date", "author__username"
+        )
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, id=self.kwargs.get("review_id"))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+
+class ReviewSearchViewSet(ListViewSet):
+    """ViewSet полнотекстового поиска по отзывам."""
+
+    queryset = Review.objects.select_related("author", "title")
+    serializer_class = ReviewSearchSerializer
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = ReviewSearchFilter
+    permission_classes = (AllowAny,)
+
+
+class CommentSearchViewSet(ListViewSet):
+    """ViewSet полнотекстового поиска по комментариям."""
+
+    queryset = Comment.objects.select_related("author")
+    serializer_class = CommentSearchSerializer
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = CommentSearchFilter
+    permission_classes = (AllowAny,)
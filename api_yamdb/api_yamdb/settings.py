@@ -69,6 +69,51 @@ DATABASES = {
 
 AUTH_USER_MODEL = "reviews.User"
 
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+# Встроенные бэкенды, которые сами ограничивают число записей и при
+# переполнении удаляют случайные из них.
+CULLING_CACHES = {
+    FILE_CACHE,
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.db.DatabaseCache",
+}
+
+
+def cache_config(prefix, location, max_entries, **params):
+    """Кэш из переменных {prefix}_BACKEND, _LOCATION и _MAX_ENTRIES."""
+    backend = os.getenv(f"{prefix}_BACKEND", FILE_CACHE)
+    config = {
+        "BACKEND": backend,
+        "LOCATION": os.getenv(f"{prefix}_LOCATION", str(location)),
+        **params,
+    }
+    if backend in CULLING_CACHES:
+        config["OPTIONS"] = {
+            "MAX_ENTRIES": int(os.getenv(f"{prefix}_MAX_ENTRIES", max_entries))
+        }
+    return config
+
+
+# Поколения моделей должны видеть все процессы сервера и команды загрузки,
+# поэтому по умолчанию оба кэша общие, в файлах рядом с базой; для
+# нескольких серверов нужен memcached или Redis. Поколения хранятся
+# отдельно от страниц и пользователей без срока жизни: вытеснение
+# поколения меняет ETag, и клиенты перестают получать 304. Файловый
+# бэкенд перечисляет каталог при каждой записи и при переполнении
+# MAX_ENTRIES удаляет треть записей наугад, поэтому запас по числу записей
+# для поколений большой, а для страниц — умеренный.
+CACHES = {
+    "default": cache_config("CACHE", BASE_DIR / "cache" / "default", 10000),
+    "generations": cache_config(
+        "GENERATIONS_CACHE",
+        BASE_DIR / "cache" / "generations",
+        1000000,
+        TIMEOUT=None,
+    ),
+}
+LIST_CACHE_TIMEOUT = int(os.getenv("LIST_CACHE_TIMEOUT", 300))
+USER_CACHE_TIMEOUT = int(os.getenv("USER_CACHE_TIMEOUT", 60))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -104,7 +149,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -121,3 +166,23 @@ SIMPLE_JWT = {
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 EMAIL = os.getenv("EMAIL")
+
+CONFIRMATION_CODE_TIMEOUT = int(
+    os.getenv("CONFIRMATION_CODE_TIMEOUT", 24 * 60 * 60)
+)
+# Использованные коды помнятся в кэше до истечения их срока действия.
+CONFIRMATION_CODE_SINGLE_USE = (
+    os.getenv("CONFIRMATION_CODE_SINGLE_USE", "1") == "1"
+)
+
+# Фильтр Блума по именам и почтам позволяет регистрации не обращаться к
+# базе, если такие имя и почта точно не заняты.
+USER_FILTER = os.getenv("USER_FILTER", "0") == "1"
+USER_FILTER_PATH = os.getenv("USER_FILTER_PATH", "")
+USER_FILTER_ERROR_RATE = float(os.getenv("USER_FILTER_ERROR_RATE", 0.01))
+
+# Взвешенный рейтинг добавляет к оценкам произведения столько оценок,
+# равных среднему по всем отзывам; рейтинги лучших хранят TOP_TITLES_DEPTH
+# мест.
+WEIGHTED_RATING_PRIOR = int(os.getenv("WEIGHTED_RATING_PRIOR", 10))
+TOP_TITLES_DEPTH = int(os.getenv("TOP_TITLES_DEPTH", 100))
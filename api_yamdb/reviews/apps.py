@@ -1,6 +1,41 @@
 from django.apps import AppConfig
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reviews"
+
+    def ready(self):
+        from .autocomplete import (KINDS, index_deleted, index_saved,
+                                   reset_index)
+        from .bloom import reset_user_filter, user_filter, user_saved
+        from .fts import restore_fts_triggers
+        from .generations import (epoch_changed, model_changed,
+                                  relation_changed)
+        from .models import (Title, TitleRank, TitleStats,
+                             UsedConfirmationCode, User)
+
+        for model in KINDS:
+            post_save.connect(index_saved, sender=model)
+            post_delete.connect(index_deleted, sender=model)
+        post_migrate.connect(reset_index, sender=self)
+
+        # Только файл: база в ready() ещё может быть недоступна, а
+        # построение по ней идёт в фоне при первой регистрации.
+        user_filter.load()
+        post_save.connect(user_saved, sender=User)
+        post_migrate.connect(reset_user_filter, sender=self)
+
+        for model in self.get_models():
+            # Статистика оценок, места в рейтинге и использованные коды
+            # не кэшируются; без обработчиков сигналов их строки удаляются
+            # одним запросом.
+            if model in (TitleStats, TitleRank, UsedConfirmationCode):
+                continue
+            post_save.connect(model_changed, sender=model)
+            post_delete.connect(model_changed, sender=model)
+        m2m_changed.connect(relation_changed, sender=Title.genre.through)
+        post_migrate.connect(epoch_changed, sender=self)
+        post_migrate.connect(restore_fts_triggers, sender=self)
@@ -0,0 +1,161 @@
+from bisect import bisect_left, insort
+from heapq import merge
+from itertools import islice
+from threading import RLock, Thread
+
+from django.db import connection, transaction
+
+from .models import Category, Genre, Title
+
+KINDS = {
+    Title: "title",
+    Genre: "genre",
+    Category: "category",
+}
+
+
+def fold(name):
+    return name.casefold()
+
+
+class PrefixIndex:
+    """Индекс названий для подсказок по префиксу.
+
+    Для каждого вида объектов ключи хранятся в отсортированном массиве,
+    поэтому поиск — это bisect и срез из limit элементов. Индекс строится
+    из базы в фоновом потоке после первого поиска, до готовности поиск
+    возвращает пустой список; дальше изменения вносятся сигналами моделей.
+    Каждый процесс держит свою копию: изменения из других процессов сюда
+    не попадают до перезапуска или reset().
+    """
+
+    def __init__(self):
+        self.lock = RLock()
+        self.keys = None
+        self.entries = {}
+        self.thread = None
+        # Изменения, сохранённые во время фонового построения.
+        self.pending = []
+
+    @property
+    def building(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def build(self):
+        keys, entries = {}, {}
+        for model, kind in KINDS.items():
+            fields = ["pk", "name"]
+            if kind != "title":
+                fields.append("slug")
+            kind_keys = keys[kind] = []
+            for pk, name, *slug in model.objects.values_list(
+                *fields
+            ).iterator():
+                key = fold(name)
+                kind_keys.append((key, pk))
+                entries[kind, pk] = (key, name, slug[0] if slug else None)
+            kind_keys.sort()
+        return keys, entries
+
+    def rebuild(self):
+        """Построение по базе с изменениями, пришедшими за это время."""
+        keys, entries = self.build()
+        with self.lock:
+            self.keys, self.entries = keys, entries
+            pending, self.pending = self.pending, []
+            for change, args in pending:
+                change(*args)
+
+    def rebuild_in_background(self):
+        with self.lock:
+            if self.building:
+                return
+            self.thread = Thread(target=self.rebuild_in_thread, daemon=True)
+            self.thread.start()
+
+    def rebuild_in_thread(self):
+        try:
+            self.rebuild()
+        finally:
+            connection.close()
+
+    def reset(self):
+        """Сброс индекса; он будет построен заново после следующего поиска."""
+        with self.lock:
+            self.keys = None
+            self.entries = {}
+            self.pending = []
+
+    def postpone(self, change, *args):
+        """True, если индекса нет; во время построения изменение копится."""
+        if self.keys is not None:
+            return False
+        if self.building:
+            self.pending.append((change, args))
+        return True
+
+    def add(self, kind, pk, name, slug=None):
+        with self.lock:
+            if self.postpone(self.add, kind, pk, name, slug):
+                return
+            self.discard(kind, pk)
+            key = fold(name)
+            insort(self.keys[kind], (key, pk))
+            self.entries[kind, pk] = (key, name, slug)
+
+    def discard(self, kind, pk):
+        with self.lock:
+            if self.postpone(self.discard, kind, pk):
+                return
+            entry = self.entries.pop((kind, pk), None)
+            if entry is not None:
+                kind_keys = self.keys[kind]
+                del kind_keys[bisect_left(kind_keys, (entry[0], pk))]
+
+    def matches(self, kind, prefix, limit):
+        kind_keys = self.keys[kind]
+        position = bisect_left(kind_keys, (prefix,))
+        for key, pk in islice(kind_keys, position, position + limit):
+            if not key.startswith(prefix):
+                break
+            yield key, kind, pk
+
+    def search(self, prefix, limit=10, kinds=None):
+        """Первые по алфавиту limit названий, начинающихся с prefix."""
+        prefix = fold(prefix)
+        with self.lock:
+            if self.keys is None:
+                self.rebuild_in_background()
+                return []
+            found = merge(*(
+                self.matches(kind, prefix, limit)
+                for kind in (kinds or self.keys)
+            ))
+            results = []
+            for _, kind, pk in islice(found, limit):
+                _, name, slug = self.entries[kind, pk]
+                results.append(
+                    {"type": kind, "id": pk, "name": name, "slug": slug}
+                )
+        return results
+
+
+autocomplete_index = PrefixIndex()
+
+
+def index_saved(sender, instance, **kwargs):
+    kind = KINDS[sender]
+    pk, name = instance.pk, instance.name
+    slug = getattr(instance, "slug", None)
+    transaction.on_commit(
+        lambda: autocomplete_index.add(kind, pk, name, slug)
+    )
+
+
+def index_deleted(sender, instance, **kwargs):
+    kind, pk = KINDS[sender], instance.pk
+    transaction.on_commit(lambda: autocomplete_index.discard(kind, pk))
+
+
+def reset_index(**kwargs):
+    autocomplete_index.reset()
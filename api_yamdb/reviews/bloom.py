@@ -0,0 +1,217 @@
+import math
+import os
+import struct
+from hashlib import blake2b
+from threading import RLock, Thread
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import User
+
+MAGIC = b"YBF1"
+HEADER = struct.Struct("<4sQIQQ")
+# Минимальная ёмкость и запас роста: фильтр на пустой или маленькой базе
+# не должен сразу переполняться новыми регистрациями.
+MIN_CAPACITY = 1024
+GROWTH = 2
+
+
+def user_keys(username, email):
+    return [f"u:{username}", f"e:{email}"]
+
+
+class BloomFilter:
+    """Фильтр Блума в массиве битов.
+
+    might_contain() не ошибается в отрицательную сторону: «нет» значит,
+    что ключ не добавлялся. Положительный ответ бывает ложным с частотой
+    около error_rate, пока число ключей не превышает capacity. Удалять
+    ключи нельзя, удалённые объекты дают только лишние положительные
+    ответы до перестроения.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        size = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.size = max(8, math.ceil(size / 8) * 8)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(self.size // 8)
+        self.count = 0
+
+    def positions(self, key):
+        digest = blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for number in range(self.hashes):
+            yield (first + number * second) % self.size
+
+    def add(self, key):
+        for position in self.positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def might_contain(self, key):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(key)
+        )
+
+    @property
+    def memory(self):
+        return len(self.bits)
+
+    def dump(self, path):
+        """Запись фильтра в файл: заголовок и массив битов как есть."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(HEADER.pack(
+                MAGIC, self.size, self.hashes, self.capacity, self.count
+            ))
+            file.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            magic, size, hashes, capacity, count = HEADER.unpack(
+                file.read(HEADER.size)
+            )
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a user filter file")
+            bits = bytearray(file.read())
+        if len(bits) * 8 != size:
+            raise ValueError(f"{path} is truncated")
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.size, bloom.hashes = capacity, size, hashes
+        bloom.bits, bloom.count = bits, count
+        return bloom
+
+
+class UserFilter:
+    """Фильтр Блума по именам и почтам пользователей для регистрации.
+
+    Включается настройкой USER_FILTER. При запуске процесса фильтр читается
+    из файла USER_FILTER_PATH, если он есть; новые пользователи добавляются
+    сигналом. Пока действующего фильтра нет, may_exist() отвечает
+    положительно, проверка остаётся за базой, а фильтр строится по таблице
+    пользователей в фоновом потоке. Каждый процесс держит свою копию,
+    поэтому пользователь из другого процесса может отсутствовать в
+    фильтре: регистрация в этом случае упирается в уникальные ограничения
+    и повторяет проверку по базе.
+    """
+
+    def __init__(self):
+        self.lock = RLock()
+        self.bloom = None
+        self.thread = None
+        # Пользователи, сохранённые во время фонового построения.
+        self.pending = []
+
+    @property
+    def enabled(self):
+        return settings.USER_FILTER
+
+    @property
+    def building(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def build(self):
+        count = User.objects.count()
+        bloom = BloomFilter(
+            max(MIN_CAPACITY, 2 * count * GROWTH),
+            settings.USER_FILTER_ERROR_RATE,
+        )
+        for username, email in User.objects.values_list(
+            "username", "email"
+        ).iterator(chunk_size=10000):
+            for key in user_keys(username, email):
+                bloom.add(key)
+        return bloom
+
+    def load(self):
+        """Чтение фильтра из USER_FILTER_PATH без обращений к базе."""
+        path = settings.USER_FILTER_PATH
+        if not self.enabled or not path or not os.path.exists(path):
+            return None
+        try:
+            bloom = BloomFilter.load(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        with self.lock:
+            self.bloom = bloom
+        return bloom
+
+    def rebuild(self):
+        """Перестроение по базе с записью в USER_FILTER_PATH, если задан."""
+        bloom = self.build()
+        with self.lock:
+            for key in self.pending:
+                bloom.add(key)
+            self.pending = []
+            if settings.USER_FILTER_PATH:
+                bloom.dump(settings.USER_FILTER_PATH)
+            self.bloom = bloom
+        return bloom
+
+    def rebuild_in_background(self):
+        with self.lock:
+            if self.building:
+                return
+            self.thread = Thread(target=self.rebuild_in_thread, daemon=True)
+            self.thread.start()
+
+    def rebuild_in_thread(self):
+        try:
+            self.rebuild()
+        finally:
+            connection.close()
+
+    def reset(self):
+        with self.lock:
+            self.bloom = None
+            self.pending = []
+
+    def add(self, username, email):
+        with self.lock:
+            keys = user_keys(username, email)
+            if self.bloom is None:
+                if self.building:
+                    self.pending.extend(keys)
+                return
+            for key in keys:
+                self.bloom.add(key)
+            # Переполненный фильтр теряет точность: до перестроения по
+            # базе проверка регистраций идёт мимо него.
+            if self.bloom.count > self.bloom.capacity:
+                self.bloom = None
+                self.rebuild_in_background()
+
+    def may_exist(self, username, email):
+        """Может ли имя или почта уже принадлежать пользователю.
+
+        При выключенном или ещё не построенном фильтре ответ всегда
+        положительный, и проверка остаётся за базой.
+        """
+        if not self.enabled:
+            return True
+        bloom = self.bloom
+        if bloom is None:
+            self.rebuild_in_background()
+            return True
+        return any(bloom.might_contain(key)
+                   for key in user_keys(username, email))
+
+
+user_filter = UserFilter()
+
+
+def user_saved(sender, instance, created, **kwargs):
+    # Смена имени или почты тоже добавляет ключи: старые остаются в
+    # фильтре и дают только лишние обращения к базе.
+    username, email = instance.username, instance.email
+    transaction.on_commit(lambda: user_filter.add(username, email))
+
+
+def reset_user_filter(**kwargs):
+    user_filter.reset()
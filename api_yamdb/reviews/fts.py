@@ -0,0 +1,147 @@
+from django.db import DatabaseError, connections, transaction
+
+# Полнотекстовые таблицы FTS5 на SQLite: таблица модели, индексируемый
+# столбец и токенизатор.
+FTS_TABLES = {
+    "reviews_title": ("name", "trigram"),
+    "reviews_review": ("text", "unicode61 remove_diacritics 2"),
+    "reviews_comment": ("text", "unicode61 remove_diacritics 2"),
+}
+
+
+def fts_table(table):
+    return f"{table}_fts"
+
+
+def table_statement(table):
+    column, tokenizer = FTS_TABLES[table]
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table(table)} USING fts5("
+        f"{column}, content='{table}', content_rowid='id', "
+        f"tokenize='{tokenizer}')"
+    )
+
+
+def trigger_statements(table):
+    """Триггеры, повторяющие изменения таблицы модели в таблице FTS5."""
+    column = FTS_TABLES[table][0]
+    fts = fts_table(table)
+    insert = (
+        f"INSERT INTO {fts} (rowid, {column}) VALUES (new.id, new.{column});"
+    )
+    delete = (
+        f"INSERT INTO {fts} ({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column});"
+    )
+    return {
+        f"{fts}_insert": (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert "
+            f"AFTER INSERT ON {table} BEGIN {insert} END"
+        ),
+        f"{fts}_delete": (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete "
+            f"AFTER DELETE ON {table} BEGIN {delete} END"
+        ),
+        f"{fts}_update": (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update "
+            f"AFTER UPDATE OF {column} ON {table} BEGIN {delete} {insert} END"
+        ),
+    }
+
+
+def rebuild_statement(table):
+    fts = fts_table(table)
+    return f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')"
+
+
+def existing_objects(connection, kind):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = %s", [kind]
+        )
+        return {name for name, in cursor.fetchall()}
+
+
+def create_fts_tables(*tables):
+    """RunPython: таблицы FTS5 с триггерами для таблиц моделей tables.
+
+    Без таблицы FTS5 поиск остаётся на icontains, поэтому на других базах
+    и на сборках SQLite без FTS5 или нужного токенизатора она не создаётся.
+    """
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        if connection.vendor != "sqlite":
+            return
+        for table in tables:
+            if not supports_tokenizer(connection, FTS_TABLES[table][1]):
+                continue
+            schema_editor.execute(table_statement(table))
+            for statement in trigger_statements(table).values():
+                schema_editor.execute(statement)
+            schema_editor.execute(rebuild_statement(table))
+
+    return run
+
+
+def drop_fts_tables(*tables):
+    """RunPython: удаление таблиц FTS5 и их триггеров."""
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for table in tables:
+            for trigger in trigger_statements(table):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts_table(table)}")
+
+    return run
+
+
+def supports_tokenizer(connection, tokenizer):
+    """Есть ли в сборке SQLite FTS5 с токенизатором tokenizer.
+
+    FTS5 может быть выключен при сборке, а trigram появился только в
+    SQLite 3.34, поэтому проверяется создание временной таблицы.
+    """
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "CREATE VIRTUAL TABLE temp.fts_probe "
+                    f"USING fts5(value, tokenize='{tokenizer}')"
+                )
+                cursor.execute("DROP TABLE temp.fts_probe")
+    except DatabaseError:
+        return False
+    return True
+
+
+def restore_fts_triggers(using="default", **kwargs):
+    """Пересоздание потерянных триггеров таблиц FTS5 после migrate.
+
+    SQLite пересоздаёт таблицу модели при многих изменениях схемы, и
+    триггеры удаляются вместе со старой таблицей. Таблица FTS5, у которой
+    не хватало триггеров, перестраивается: изменения, прошедшие без них,
+    в индекс не попали. Возвращает список перестроенных таблиц.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return []
+    tables = existing_objects(connection, "table")
+    triggers = existing_objects(connection, "trigger")
+    restored = []
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for table in FTS_TABLES:
+            if fts_table(table) not in tables:
+                continue
+            missing = [
+                statement
+                for name, statement in trigger_statements(table).items()
+                if name not in triggers
+            ]
+            if not missing:
+                continue
+            for statement in missing:
+                cursor.execute(statement)
+            cursor.execute(rebuild_statement(table))
+            restored.append(fts_table(table))
+    return restored
@@ -0,0 +1,97 @@
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Comment, Review
+
+# Отзывы и комментарии, кроме общего поколения модели, ведут поколения
+# по родительскому объекту, чтобы запись в одну ленту не сбрасывала другие.
+SCOPE_FIELDS = {
+    Review: "title_id",
+    Comment: "review_id",
+}
+EPOCH_KEY = "generation:*"
+# Поколения живут в отдельном кэше без срока жизни: записи страниц и
+# пользователей не вытесняют их.
+GENERATIONS_CACHE = "generations"
+
+
+def generations_cache():
+    return caches[GENERATIONS_CACHE]
+
+
+def generation_key(model, scope=None):
+    key = f"generation:{model._meta.label_lower}"
+    if scope is None:
+        return key
+    return f"{key}:{scope}"
+
+
+def get_generations(scopes):
+    """Поколения пар (модель, область) и общей эпохи одним обращением.
+
+    Поколение — время последнего изменения в наносекундах. Счётчик,
+    вытесненный из кэша, начинается с текущего времени: это не совпадает
+    ни с одним из прежних значений и не занижает время изменения.
+    """
+    keys = [EPOCH_KEY] + [
+        generation_key(model, scope) for model, scope in scopes
+    ]
+    cache = generations_cache()
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        stored = cache.get_many(missing)
+        found.update({key: stored.get(key, now) for key in missing})
+    return [found[key] for key in keys]
+
+
+def bump_keys(keys):
+    cache = generations_cache()
+    now = time.time_ns()
+    current = cache.get_many(keys)
+    cache.set_many(
+        {key: max(now, current.get(key, 0) + 1) for key in keys},
+        timeout=None,
+    )
+
+
+def bump_generation(*models, scope=None):
+    """Смена поколения моделей: закэшированные по старому ответы устаревают.
+
+    Вызывается после фиксации транзакции, иначе параллельный запрос мог бы
+    сохранить незафиксированные данные под новым поколением.
+    """
+    bump_keys([generation_key(model, scope) for model in models])
+
+
+def bump_epoch():
+    """Смена поколения всех моделей и областей сразу.
+
+    Нужна после массовой записи мимо моделей: загрузки csv, генерации
+    данных, migrate и flush.
+    """
+    bump_keys([EPOCH_KEY])
+
+
+def bump_on_commit(*models, scope=None):
+    transaction.on_commit(lambda: bump_generation(*models, scope=scope))
+
+
+def model_changed(sender, instance, **kwargs):
+    bump_on_commit(sender)
+    if sender in SCOPE_FIELDS:
+        bump_on_commit(sender, scope=getattr(instance, SCOPE_FIELDS[sender]))
+
+
+def relation_changed(sender, action, instance, model, **kwargs):
+    if action.startswith("post_"):
+        bump_on_commit(type(instance), model)
+
+
+def epoch_changed(**kwargs):
+    bump_epoch()
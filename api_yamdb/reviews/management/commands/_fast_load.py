@@ -0,0 +1,138 @@
+import csv
+import io
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import DateTimeField
+from django.utils import timezone
+
+from ._utils import insert_sql
+
+
+def datetime_converter(field):
+    adapt = connection.ops.adapt_datetimefield_value
+
+    def convert(value):
+        if not value:
+            return None
+        try:
+            # fromisoformat разбирает ISO 8601 на порядок быстрее, чем
+            # to_python; остальные форматы остаются за полем.
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            parsed = field.to_python(value)
+        if settings.USE_TZ and timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return adapt(parsed)
+
+    return convert
+
+
+def empty_to_null(value):
+    return value or None
+
+
+def value_converter(field):
+    """Преобразование строки csv в значение для вставки мимо ORM."""
+    if isinstance(field, DateTimeField):
+        return datetime_converter(field)
+    if field.empty_strings_allowed:
+        return None
+    return empty_to_null
+
+
+def default_value(field):
+    if getattr(field, "auto_now", False) or getattr(
+        field, "auto_now_add", False
+    ):
+        value = timezone.now()
+    else:
+        value = field.get_default()
+    return field.get_db_prep_save(value, connection)
+
+
+def column_plan(model, names):
+    """Столбцы для вставки: поля из csv и значения по умолчанию остальных."""
+    fields = [model._meta.get_field(name) for name in names]
+    provided = {field.attname for field in fields}
+    missing = [
+        field for field in model._meta.concrete_fields
+        if field.attname not in provided and not field.primary_key
+    ]
+    return (
+        fields + missing,
+        [value_converter(field) for field in fields],
+        [default_value(field) for field in missing],
+    )
+
+
+def fast_insert(model, rows):
+    """Вставка строк csv без создания экземпляров моделей.
+
+    Внешние ключи уже переименованы в *_id, поэтому столбцы находятся
+    через get_field; на PostgreSQL строки передаются через COPY FROM
+    STDIN, на остальных базах — одним executemany.
+    """
+    names = list(rows[0])
+    fields, converters, defaults = column_plan(model, names)
+    values = [
+        [
+            row[name] if convert is None else convert(row[name])
+            for name, convert in zip(names, converters)
+        ] + defaults
+        for row in rows
+    ]
+    if connection.vendor == "postgresql":
+        copy_rows(model, fields, values)
+    else:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                insert_sql(model, [field.column for field in fields]), values
+            )
+    return len(values)
+
+
+def copy_rows(model, fields, values):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(values)
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    # Пустое значение в csv для COPY означает NULL; текстовым столбцам
+    # без NULL оно должно попасть как пустая строка.
+    not_null = [
+        quote(field.column) for field in fields
+        if field.empty_strings_allowed and not field.null
+    ]
+    options = "FORMAT csv"
+    if not_null:
+        options += f", FORCE_NOT_NULL ({', '.join(not_null)})"
+    sql = "COPY {} ({}) FROM STDIN WITH ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+        options,
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
+
+
+@contextmanager
+def relaxed_durability():
+    """Ослабление гарантий сброса на диск SQLite на время загрузки."""
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        synchronous = cursor.fetchone()[0]
+        cursor.execute("PRAGMA journal_mode")
+        journal_mode = cursor.fetchone()[0]
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+            cursor.execute(f"PRAGMA synchronous = {synchronous}")
@@ -0,0 +1,39 @@
+import itertools
+
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+
+
+def chunked(iterable, size):
+    """Разбиение итерируемого объекта на списки длиной не более size."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def next_id(model):
+    """Первый свободный первичный ключ модели."""
+    last_id = model.objects.aggregate(last_id=Max("id"))["last_id"]
+    return (last_id or 0) + 1
+
+
+def insert_sql(model, columns):
+    """INSERT в таблицу модели с параметрами для executemany."""
+    quote = connection.ops.quote_name
+    return "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+
+
+def reset_sequences(models):
+    """Сдвиг последовательностей первичных ключей после явных id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
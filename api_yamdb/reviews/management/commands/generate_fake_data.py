@@ -0,0 +1,289 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from reviews.autocomplete import autocomplete_index
+from reviews.bloom import user_filter
+from reviews.generations import bump_epoch
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, User)
+from reviews.ratings import rebuild_title_ratings
+
+from ._fast_load import copy_rows
+from ._utils import chunked, insert_sql, next_id, reset_sequences
+
+WORDS = (
+    "время", "город", "дорога", "ночь", "море", "звезда", "история", "дом",
+    "свет", "тень", "ветер", "песня", "лето", "зима", "сердце", "мечта",
+    "огонь", "река", "небо", "путь", "друг", "тайна", "война", "мир",
+)
+ROLES = (User.UserRole.USER, User.UserRole.MODERATOR, User.UserRole.ADMIN)
+ROLE_WEIGHTS = (0.97, 0.02, 0.01)
+TEXT_POOL_SIZE = 4096
+
+
+class Command(BaseCommand):
+    """Служебная команда для генерации большого набора тестовых данных."""
+
+    help = "Generate a synthetic dataset for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--genres", type=int, default=30)
+        parser.add_argument("--titles", type=int, default=10000)
+        parser.add_argument("--reviews", type=int, default=100000)
+        parser.add_argument("--comments", type=int, default=100000)
+        parser.add_argument(
+            "--genres-per-title", type=int, default=3,
+            help="Maximum number of genres linked to one title",
+        )
+        parser.add_argument(
+            "--zipf", type=float, default=1.1,
+            help="Zipf exponent of title popularity, 0 for uniform",
+        )
+        parser.add_argument(
+            "--bursts", type=int, default=20,
+            help="Number of review bursts over the time span",
+        )
+        parser.add_argument(
+            "--burst-share", type=float, default=0.3,
+            help="Share of reviews and comments posted during bursts",
+        )
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options["reviews"] and not (options["titles"] and options["users"]):
+            raise CommandError("Reviews require at least one title and user")
+        if options["comments"] and not options["reviews"]:
+            raise CommandError("Comments require at least one review")
+        self.options = options
+        self.random = random.Random(options["seed"])
+        self.now = timezone.now()
+        # Наивное время в UTC адаптируется бэкендом без пересчёта зоны.
+        self.utc_now = timezone.make_naive(self.now, timezone.utc)
+        self.adapt_datetime = connection.ops.adapt_datetimefield_value
+        self.texts = {}
+        self.start_ids = {
+            model: next_id(model)
+            for model in (User, Category, Genre, Title, Review, Comment)
+        }
+        self.make_bursts()
+        started = time.monotonic()
+        with transaction.atomic():
+            total = sum((
+                self.insert(User, self.users()),
+                self.insert(Category, self.categories()),
+                self.insert(Genre, self.genres()),
+                self.insert(Title, self.titles()),
+                self.insert(GenreTitle, self.genre_titles()),
+                self.insert(Review, self.reviews()),
+                self.insert(Comment, self.comments()),
+            ))
+            reset_sequences(
+                (User, Category, Genre, Title, GenreTitle, Review, Comment)
+            )
+            rebuild_title_ratings()
+        # Строки вставлены мимо моделей, сигналы индекс не обновили.
+        autocomplete_index.reset()
+        user_filter.reset()
+        bump_epoch()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {total} rows in {elapsed:.1f}s "
+            f"({total / max(elapsed, 1e-9):.0f} rows/s)"
+        ))
+
+    def insert(self, model, rows):
+        """Вставка строк пачками, минуя модели.
+
+        На PostgreSQL пачка передаётся через COPY FROM STDIN, на остальных
+        базах — через executemany.
+        """
+        names, rows = rows
+        fields = [model._meta.get_field(name) for name in names]
+        sql = insert_sql(model, [field.column for field in fields])
+        count = 0
+        started = time.monotonic()
+        with connection.cursor() as cursor:
+            for chunk in chunked(rows, self.options["batch_size"]):
+                if connection.vendor == "postgresql":
+                    copy_rows(model, fields, chunk)
+                else:
+                    cursor.executemany(sql, chunk)
+                count += len(chunk)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"{model._meta.db_table}: {count} rows in {elapsed:.1f}s"
+        )
+        return count
+
+    def ids(self, model, option):
+        start = self.start_ids[model]
+        return range(start, start + self.options[option])
+
+    def text(self, words):
+        """Случайный текст из заранее собранного пула для данной длины."""
+        pool = self.texts.get(words)
+        if pool is None:
+            pool = self.texts[words] = [
+                " ".join(self.random.choices(WORDS, k=words)).capitalize()
+                for _ in range(TEXT_POOL_SIZE)
+            ]
+        return self.random.choice(pool)
+
+    def make_bursts(self):
+        """Моменты всплесков активности внутри временного окна."""
+        span = self.options["days"] * 86400
+        self.span = span
+        self.bursts = [
+            self.random.uniform(0, span)
+            for _ in range(self.options["bursts"])
+        ]
+
+    def zipf_rank(self, size):
+        """Ранг от 1 до size с распределением, близким к закону Ципфа."""
+        exponent = self.options["zipf"]
+        uniform = self.random.random()
+        if exponent == 1:
+            rank = size ** uniform
+        else:
+            power = 1 - exponent
+            rank = ((1 - uniform) + uniform * size ** power) ** (1 / power)
+        return min(size, max(1, int(rank)))
+
+    def pub_date(self):
+        if self.bursts and self.random.random() < self.options["burst_share"]:
+            offset = self.random.choice(self.bursts)
+            offset += abs(self.random.gauss(0, 3600))
+        else:
+            offset = self.random.uniform(0, self.span)
+        offset = min(offset, self.span)
+        return self.adapt_datetime(
+            self.utc_now - timedelta(seconds=self.span - offset)
+        )
+
+    def users(self):
+        joined = self.adapt_datetime(self.utc_now)
+        fields = (
+            "id", "username", "email", "password", "role", "bio",
+            "first_name", "last_name", "is_superuser", "is_staff",
+            "is_active", "date_joined",
+        )
+        rows = (
+            (
+                pk, f"user_{pk}", f"user_{pk}@yamdb.fake", "!",
+                self.random.choices(ROLES, ROLE_WEIGHTS)[0], "", "", "",
+                False, False, True, joined,
+            )
+            for pk in self.ids(User, "users")
+        )
+        return fields, rows
+
+    def categories(self):
+        rows = (
+            (pk, f"Категория {pk}", f"category-{pk}")
+            for pk in self.ids(Category, "categories")
+        )
+        return ("id", "name", "slug"), rows
+
+    def genres(self):
+        rows = (
+            (pk, f"Жанр {pk}", f"genre-{pk}")
+            for pk in self.ids(Genre, "genres")
+        )
+        return ("id", "name", "slug"), rows
+
+    def titles(self):
+        categories = self.ids(Category, "categories")
+        year = self.now.year
+        fields = (
+            "id", "name", "year", "description", "category",
+            "rating_sum", "rating_count",
+        )
+        rows = (
+            (
+                pk, f"{self.text(2)} {pk}", self.random.randint(1900, year),
+                self.text(12),
+                self.random.choice(categories) if categories else None,
+                0, 0,
+            )
+            for pk in self.ids(Title, "titles")
+        )
+        return fields, rows
+
+    def genre_titles(self):
+        genres = self.ids(Genre, "genres")
+        limit = min(self.options["genres_per_title"], len(genres))
+        rows = (
+            (pk, genre)
+            for pk in self.ids(Title, "titles")
+            for genre in self.random.sample(
+                genres, self.random.randint(1, limit) if limit else 0
+            )
+        )
+        return ("title", "genre"), rows
+
+    def review_counts(self):
+        """Число отзывов на каждое произведение по закону Ципфа.
+
+        Пользователь пишет не больше одного отзыва на произведение, поэтому
+        число отзывов ограничено числом пользователей; масштаб подбирается
+        так, чтобы излишек самых популярных произведений перешёл остальным.
+        """
+        titles = self.options["titles"]
+        users = self.options["users"]
+        target = min(self.options["reviews"], titles * users)
+        weights = [
+            1 / rank ** self.options["zipf"] for rank in range(1, titles + 1)
+        ]
+        self.random.shuffle(weights)
+        low, high = 0, target / min(weights)
+        for _ in range(60):
+            scale = (low + high) / 2
+            total = sum(min(users, weight * scale) for weight in weights)
+            low, high = (scale, high) if total < target else (low, scale)
+        return [min(users, round(weight * high)) for weight in weights]
+
+    def reviews(self):
+        users = self.ids(User, "users")
+        fields = ("id", "title", "author", "text", "score", "pub_date")
+
+        def rows():
+            pk = self.start_ids[Review]
+            for title, count in zip(
+                self.ids(Title, "titles"), self.review_counts()
+            ):
+                quality = self.random.gauss(6.5, 1.5)
+                for author in self.random.sample(users, count):
+                    score = round(self.random.gauss(quality, 1.5))
+                    yield (
+                        pk, title, author, self.text(20),
+                        min(10, max(1, score)), self.pub_date(),
+                    )
+                    pk += 1
+            self.last_review_id = pk
+
+        return fields, rows()
+
+    def comments(self):
+        users = self.ids(User, "users")
+        fields = ("id", "review", "author", "text", "pub_date")
+
+        def rows():
+            reviews = range(self.start_ids[Review], self.last_review_id)
+            if not reviews:
+                return
+            # Комментарии, как и отзывы, тяготеют к популярным записям.
+            for pk in self.ids(Comment, "comments"):
+                yield (
+                    pk, reviews[self.zipf_rank(len(reviews)) - 1],
+                    self.random.choice(users), self.text(10), self.pub_date(),
+                )
+
+        return fields, rows()
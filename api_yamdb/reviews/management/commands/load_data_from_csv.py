@@ -1,9 +1,22 @@
+import os
+import time
+from concurrent.futures import (ALL_COMPLETED, FIRST_COMPLETED,
+                                ThreadPoolExecutor, wait)
+from contextlib import contextmanager, nullcontext
 from csv import DictReader
 
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from reviews.autocomplete import autocomplete_index
+from reviews.bloom import user_filter
+from reviews.generations import bump_epoch
 from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
                             Title, User)
+from reviews.ratings import rebuild_title_ratings
+
+from ._fast_load import fast_insert, relaxed_durability
+from ._utils import chunked, reset_sequences
 
 TABLES = {
     User: "users.csv",
@@ -14,6 +27,156 @@ TABLES = {
     Comment: "comments.csv",
     GenreTitle: "genre_title.csv",
 }
+FOREIGN_KEYS = ("category", "author")
+INSERT, UPSERT, FAST = "insert", "upsert", "fast"
+# Поля отзыва, от которых зависит рейтинг произведения.
+RATING_FIELDS = {"title_id", "score"}
+# Число произведений в одном пересчёте рейтингов после --upsert.
+RATING_BATCH_SIZE = 500
+
+
+def read_rows(csv_file):
+    """Ленивое чтение строк csv с переименованием внешних ключей."""
+    for row in DictReader(csv_file):
+        for field in FOREIGN_KEYS:
+            if field in row:
+                row[f"{field}_id"] = row.pop(field)
+        yield row
+
+
+def dependency_levels(models):
+    """Уровни графа зависимостей моделей по внешним ключам.
+
+    Модели одного уровня не ссылаются друг на друга и могут загружаться
+    одновременно; каждый следующий уровень зависит только от предыдущих.
+    """
+    pending = {
+        model: {
+            field.related_model
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    levels = []
+    while pending:
+        level = [model for model, deps in pending.items() if not deps]
+        if not level:
+            raise CommandError(
+                "Circular foreign keys between "
+                + ", ".join(model.__name__ for model in pending)
+            )
+        levels.append(level)
+        for model in level:
+            del pending[model]
+        for deps in pending.values():
+            deps.difference_update(level)
+    return levels
+
+
+def row_changes(model, row, current):
+    """Поля строки csv, значения которых отличаются от сохранённых."""
+    changes = {}
+    for name, raw_value in row.items():
+        field = model._meta.get_field(name)
+        if field.primary_key:
+            continue
+        value = field.to_python(raw_value)
+        if value != getattr(current, field.attname):
+            changes[field.attname] = value
+    return changes
+
+
+@contextmanager
+def csv_dates(models):
+    """Даты из csv вместо времени загрузки в полях auto_now_add.
+
+    Так все режимы сохраняют одни и те же строки. Флаг снимается на всю
+    загрузку, а не на пачку: пачки параллельных потоков сохраняются
+    одновременно.
+    """
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now_add", False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def rated_titles(model, rows):
+    """Произведения, рейтинг которых меняют строки отзывов rows."""
+    if model is not Review:
+        return set()
+    to_python = Title._meta.pk.to_python
+    return {to_python(row["title_id"]) for row in rows}
+
+
+def save_chunk(model, rows, mode=INSERT):
+    """Сохранение пачки строк.
+
+    Возвращает число созданных и обновлённых строк и множество
+    произведений, чьи отзывы изменились. В режиме FAST строки вставляются
+    средствами базы без создания экземпляров моделей.
+    """
+    if mode == FAST:
+        return fast_insert(model, rows), 0, rated_titles(model, rows)
+    objs = [model(**row) for row in rows]
+    if mode == UPSERT:
+        return upsert_chunk(model, rows, objs)
+    model.objects.bulk_create(objs)
+    return len(objs), 0, rated_titles(model, rows)
+
+
+def upsert_chunk(model, rows, objs):
+    """Сверка пачки с сохранёнными строками по первичному ключу.
+
+    Новые строки создаются, изменившиеся обновляются, остальные
+    пропускаются.
+    """
+    pk_field = model._meta.pk
+    existing = model.objects.in_bulk(
+        [pk_field.to_python(obj.pk) for obj in objs]
+    )
+    created, updated, fields, titles = [], [], set(), set()
+    for row, obj in zip(rows, objs):
+        current = existing.get(pk_field.to_python(obj.pk))
+        if current is None:
+            created.append(obj)
+            titles |= rated_titles(model, [row])
+            continue
+        changes = row_changes(model, row, current)
+        if not changes:
+            continue
+        if changes.keys() & RATING_FIELDS:
+            # Отзыв, перенесённый к другому произведению, меняет оба.
+            titles |= rated_titles(model, [{"title_id": current.title_id}])
+            titles |= rated_titles(model, [row])
+        for attname, value in changes.items():
+            setattr(current, attname, value)
+        updated.append(current)
+        fields.update(changes)
+    model.objects.bulk_create(created)
+    if updated:
+        model.objects.bulk_update(updated, fields)
+    return len(created), len(updated), titles
+
+
+def save_chunk_in_thread(model, rows, mode):
+    """Сохранение пачки в отдельной транзакции рабочего потока."""
+    try:
+        with transaction.atomic():
+            return model, save_chunk(model, rows, mode)
+    finally:
+        connection.close()
 
 
 class Command(BaseCommand):
@@ -21,18 +184,169 @@ class Command(BaseCommand):
 
     help = "Load data from csv"
 
-    def handle(self, *args, **kwargs):
-        for model in TABLES:
-            with open(
-                f"{settings.BASE_DIR}/static/data/" + TABLES[model],
-                newline="",
-                encoding="utf8",
-            ) as csv_file:
-                objs = []
-                for row in DictReader(csv_file):
-                    for field in ("category", "author"):
-                        if field in row:
-                            row[f"{field}_id"] = row[field]
-                            del row[field]
-                    objs.append(model(**row))
-                model.objects.bulk_create(objs)
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--data-dir",
+            default=os.path.join(settings.BASE_DIR, "static", "data"),
+            help="Directory with the csv files",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+            help="Number of rows inserted per query",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help=(
+                "Number of parallel loaders, 0 for one per CPU core. With "
+                "more than one worker every batch is committed separately "
+                "instead of one transaction per file"
+            ),
+        )
+        parser.add_argument(
+            "--upsert", action="store_true",
+            help=(
+                "Compare rows with the stored ones by primary key, insert "
+                "new rows, update changed ones and skip the rest"
+            ),
+        )
+        parser.add_argument(
+            "--fast", action="store_true",
+            help=(
+                "Insert rows with COPY on PostgreSQL or executemany "
+                "elsewhere, bypassing model instances. On SQLite this also "
+                "turns off syncing and keeps the journal in memory for the "
+                "duration of the load, giving up crash safety: a crash "
+                "mid-load can corrupt the database file"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        self.data_dir = options["data_dir"]
+        self.batch_size = options["batch_size"]
+        if options["upsert"] and options["fast"]:
+            raise CommandError("--upsert and --fast are mutually exclusive")
+        self.mode = INSERT
+        if options["upsert"]:
+            self.mode = UPSERT
+        elif options["fast"]:
+            self.mode = FAST
+        workers = options["workers"] or os.cpu_count()
+        if workers > 1 and connection.vendor == "sqlite":
+            self.stderr.write(self.style.WARNING(
+                "SQLite allows a single writer, loading sequentially"
+            ))
+            workers = 1
+        levels = dependency_levels(TABLES)
+        self.changed = 0
+        self.title_ids = set()
+        # Без сброса на диск и с журналом в памяти сбой посреди загрузки
+        # может повредить файл базы, поэтому это только для --fast.
+        durability = (
+            relaxed_durability() if self.mode == FAST else nullcontext()
+        )
+        with durability, csv_dates(TABLES):
+            if workers > 1:
+                self.load_parallel(levels, workers)
+            else:
+                for level in levels:
+                    for model in level:
+                        self.load_table(model)
+        if self.changed:
+            self.refresh_derived_data()
+
+    def refresh_derived_data(self):
+        """Пересчёт рейтингов и сброс кэшей и индексов после изменений."""
+        reset_sequences(TABLES)
+        if self.mode == UPSERT:
+            for title_ids in chunked(
+                sorted(self.title_ids), RATING_BATCH_SIZE
+            ):
+                rebuild_title_ratings(title_ids)
+        else:
+            rebuild_title_ratings()
+        autocomplete_index.reset()
+        user_filter.reset()
+        bump_epoch()
+
+    def open_table(self, model):
+        return open(
+            os.path.join(self.data_dir, TABLES[model]),
+            newline="",
+            encoding="utf8",
+        )
+
+    def load_table(self, model):
+        """Загрузка одного файла в одной транзакции пачками."""
+        started = time.monotonic()
+        counts = [0, 0]
+        with self.open_table(model) as csv_file, transaction.atomic():
+            for rows in chunked(read_rows(csv_file), self.batch_size):
+                created, updated, title_ids = save_chunk(
+                    model, rows, self.mode
+                )
+                counts[0] += created
+                counts[1] += updated
+                self.add_changes(created + updated, title_ids)
+                if self.verbosity > 1:
+                    self.report(model, counts, started)
+        if self.verbosity == 1:
+            self.report(model, counts, started)
+
+    def load_parallel(self, levels, workers):
+        """Загрузка независимых таблиц и их пачек в пуле потоков."""
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for level in levels:
+                started = time.monotonic()
+                counts = {model: [0, 0] for model in level}
+                running = set()
+                for model in level:
+                    with self.open_table(model) as csv_file:
+                        for rows in chunked(
+                            read_rows(csv_file), self.batch_size
+                        ):
+                            # Ограничение числа пачек в очереди держит
+                            # расход памяти постоянным.
+                            if len(running) >= workers * 2:
+                                running = self.collect(
+                                    running, counts, started, FIRST_COMPLETED
+                                )
+                            running.add(pool.submit(
+                                save_chunk_in_thread, model, rows, self.mode
+                            ))
+                self.collect(running, counts, started)
+                if self.verbosity == 1:
+                    for model, model_counts in counts.items():
+                        self.report(model, model_counts, started)
+
+    def collect(self, running, counts, started, return_when=ALL_COMPLETED):
+        """Ожидание пачек; ошибка любой из них прерывает загрузку."""
+        done, running = wait(running, return_when=return_when)
+        for future in done:
+            try:
+                model, (created, updated, title_ids) = future.result()
+            except Exception as error:
+                for future in running:
+                    future.cancel()
+                raise CommandError(f"Batch import failed: {error}") from error
+            counts[model][0] += created
+            counts[model][1] += updated
+            self.add_changes(created + updated, title_ids)
+            if self.verbosity > 1:
+                self.report(model, counts[model], started)
+        return running
+
+    def add_changes(self, rows, title_ids):
+        self.changed += rows
+        self.title_ids |= title_ids
+
+    def report(self, model, counts, started):
+        created, updated = counts
+        elapsed = time.monotonic() - started
+        message = f"{TABLES[model]}: {created} rows created"
+        if self.mode == UPSERT:
+            message += f", {updated} updated"
+        self.stdout.write(
+            f"{message}, {(created + updated) / max(elapsed, 1e-9):.0f} "
+            "rows/s"
+        )
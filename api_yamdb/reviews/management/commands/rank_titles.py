@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand
+from reviews.ranking import rank_titles
+
+
+class Command(BaseCommand):
+    """Служебная команда для пересчёта взвешенных рейтингов и мест."""
+
+    help = "Recompute weighted title ratings and the top titles tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prior", type=int, default=None,
+            help="Number of mean-valued votes added to every title",
+        )
+        parser.add_argument(
+            "--depth", type=int, default=None,
+            help="Number of places stored for every ranking",
+        )
+
+    def handle(self, *args, **options):
+        changed, places = rank_titles(options["prior"], options["depth"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Weighted ratings changed: {changed}, ranked places: {places}"
+        ))
@@ -0,0 +1,17 @@
+from django.core.management import BaseCommand
+from reviews.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    """Служебная команда для перестроения полнотекстовых индексов."""
+
+    help = "Rebuild full-text search tables from titles, reviews and comments"
+
+    def handle(self, *args, **kwargs):
+        tables = rebuild_search_index()
+        if not tables:
+            self.stdout.write("No full-text tables to rebuild")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Search index rebuilt: {', '.join(tables)}")
+        )
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+from reviews.ratings import rebuild_title_ratings
+
+
+class Command(BaseCommand):
+    """Служебная команда для пересчёта рейтингов произведений."""
+
+    help = "Rebuild stored title ratings and score histograms from reviews"
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_title_ratings()
+        self.stdout.write(
+            self.style.SUCCESS(f"Ratings rebuilt for {count} titles")
+        )
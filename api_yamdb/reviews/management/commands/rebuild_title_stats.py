@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+from reviews.ratings import rebuild_title_stats
+
+
+class Command(BaseCommand):
+    """Служебная команда для пересчёта распределений оценок."""
+
+    help = "Rebuild per-title score histograms from reviews"
+
+    def handle(self, *args, **kwargs):
+        count = rebuild_title_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f"Score stats rebuilt for {count} titles")
+        )
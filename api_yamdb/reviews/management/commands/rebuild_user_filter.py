@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+from reviews.bloom import user_filter
+
+
+class Command(BaseCommand):
+    """Служебная команда для перестроения фильтра имён и почт."""
+
+    help = (
+        "Rebuild the username/email Bloom filter and save it to "
+        "USER_FILTER_PATH"
+    )
+
+    def handle(self, *args, **kwargs):
+        bloom = user_filter.rebuild()
+        self.stdout.write(
+            f"Keys: {bloom.count}, capacity: {bloom.capacity}, "
+            f"bits: {bloom.size}, hashes: {bloom.hashes}, "
+            f"memory: {bloom.memory / 1024:.1f} KiB"
+        )
+        if settings.USER_FILTER_PATH:
+            self.stdout.write(self.style.SUCCESS(
+                f"User filter saved to {settings.USER_FILTER_PATH}"
+            ))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management import BaseCommand
+from reviews.outbox import MAX_ATTEMPTS, deliver_outbox
+
+
+class Command(BaseCommand):
+    """Служебная команда для отправки писем из очереди."""
+
+    help = "Send queued emails in batches over one connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--max-attempts", type=int, default=MAX_ATTEMPTS,
+            help="Give up on an email after this many failed attempts",
+        )
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep polling the outbox instead of exiting when drained",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=1.0,
+            help="Seconds between polls in --loop mode",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_outbox(
+                options["batch_size"], options["max_attempts"]
+            )
+            if sent or failed or not options["loop"]:
+                self.stdout.write(f"Emails sent: {sent}, failed: {failed}")
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
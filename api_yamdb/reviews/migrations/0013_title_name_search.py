@@ -0,0 +1,41 @@
+from django.db import migrations
+from reviews.fts import create_fts_tables, drop_fts_tables
+
+# icontains на PostgreSQL сравнивает UPPER(name::text) LIKE UPPER(%s),
+# поэтому индекс строится по тому же выражению, иначе планировщик его
+# не использует.
+POSTGRESQL_FORWARD = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX title_name_trgm_idx ON reviews_title '
+    'USING gin (UPPER(name) gin_trgm_ops)',
+)
+POSTGRESQL_BACKWARD = (
+    'DROP INDEX IF EXISTS title_name_trgm_idx',
+)
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_genre_title_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_fts_tables('reviews_title'),
+            drop_fts_tables('reviews_title'),
+        ),
+        migrations.RunPython(
+            run_postgresql(POSTGRESQL_FORWARD),
+            run_postgresql(POSTGRESQL_BACKWARD),
+        ),
+    ]
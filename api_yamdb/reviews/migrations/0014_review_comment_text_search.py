@@ -0,0 +1,48 @@
+from django.db import migrations
+from reviews.fts import create_fts_tables, drop_fts_tables
+
+
+def postgresql_index_statement(table, name):
+    # Выражение совпадает с тем, что строит SearchVector('text',
+    # config='russian'), иначе планировщик не использует индекс.
+    return (
+        f'CREATE INDEX {name} ON {table} USING gin '
+        f"(to_tsvector('russian'::regconfig, COALESCE(text, '')))"
+    )
+
+
+POSTGRESQL_FORWARD = (
+    postgresql_index_statement('reviews_review', 'review_text_search_idx'),
+    postgresql_index_statement('reviews_comment', 'comment_text_search_idx'),
+)
+POSTGRESQL_BACKWARD = (
+    'DROP INDEX IF EXISTS review_text_search_idx',
+    'DROP INDEX IF EXISTS comment_text_search_idx',
+)
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_title_name_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_fts_tables('reviews_review', 'reviews_comment'),
+            drop_fts_tables('reviews_review', 'reviews_comment'),
+        ),
+        migrations.RunPython(
+            run_postgresql(POSTGRESQL_FORWARD),
+            run_postgresql(POSTGRESQL_BACKWARD),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2 on 2026-10-18 18:59
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_title_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    stats = {}
+    for title_id, score, number in (
+        Review.objects.filter(score__range=(1, 10)).order_by()
+        .values_list('title_id', 'score').annotate(number=Count('pk'))
+    ):
+        stats.setdefault(title_id, TitleStats(title_id=title_id))
+        setattr(stats[title_id], f'score_{score}', number)
+    TitleStats.objects.bulk_create(stats.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_remove_user_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Число оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Число оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Число оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Число оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Число оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Число оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Число оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Число оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Число оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Число оценок 10')),
+            ],
+            options={
+                'verbose_name': 'Статистика оценок',
+                'verbose_name_plural': 'Статистика оценок',
+            },
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
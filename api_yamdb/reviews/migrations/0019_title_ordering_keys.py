@@ -0,0 +1,66 @@
+# Generated by Django 3.2 on 2026-10-18 19:07
+
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
+
+
+# Сортировка по рейтингу ставит произведения без отзывов (NULL) первыми
+# по возрастанию и последними по убыванию, как SQLite по умолчанию. На
+# PostgreSQL NULL по умолчанию больше любых значений, поэтому индекс
+# строится с NULLS FIRST, иначе обе сортировки не совпадают с ним.
+def rating_nulls_first(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX title_rating_id_idx')
+        schema_editor.execute(
+            'CREATE INDEX title_rating_id_idx ON reviews_title '
+            '(rating ASC NULLS FIRST, id)'
+        )
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.update(
+        rating=Cast('rating_sum', FloatField()) / NullIf(F('rating_count'), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0018_title_weighted_rating_rank'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='title',
+            options={'ordering': ['id'], 'verbose_name': 'Произведение', 'verbose_name_plural': 'Произведения'},
+        ),
+        migrations.RemoveIndex(
+            model_name='title',
+            name='title_year_idx',
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, null=True, verbose_name='Средняя оценка'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating_count', 'id'], name='title_rating_count_id_idx'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+        migrations.RunPython(rating_nulls_first, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0019_title_ordering_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsedConfirmationCode',
+            fields=[
+                ('signature', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Подпись кода')),
+                ('expires', models.DateTimeField(db_index=True, verbose_name='Окончание срока действия')),
+            ],
+            options={
+                'verbose_name': 'Использованный код подтверждения',
+                'verbose_name_plural': 'Использованные коды подтверждения',
+            },
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.contrib.auth.models import AbstractUser
 from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     RegexValidator)
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -40,13 +41,6 @@ class User(AbstractUser):
     )
     bio = models.TextField(blank=True, verbose_name="Биография")
 
-    confirmation_code = models.CharField(
-        verbose_name="Токен пользователя",
-        max_length=100,
-        blank=True,
-        null=True,
-    )
-
     class Meta:
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
@@ -127,20 +121,176 @@ class Title(models.Model):
         verbose_name="Slug категории",
     )
 
+    rating_sum = models.PositiveIntegerField(
+        default=0, verbose_name="Сумма оценок"
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0, verbose_name="Количество оценок"
+    )
+    rating = models.FloatField(
+        null=True, blank=True, verbose_name="Средняя оценка"
+    )
+    weighted_rating = models.FloatField(
+        null=True, blank=True, verbose_name="Взвешенный рейтинг"
+    )
+
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
+        ordering = ["id"]
+        indexes = [
+            models.Index(
+                fields=["category", "year"], name="title_category_year_idx"
+            ),
+            # Ключи сортировки списка: каждая сортировка с добавкой id —
+            # это проход по индексу, а не сортировка выборки.
+            models.Index(fields=["name", "id"], name="title_name_id_idx"),
+            models.Index(fields=["year", "id"], name="title_year_id_idx"),
+            models.Index(
+                fields=["rating", "id"], name="title_rating_id_idx"
+            ),
+            models.Index(
+                fields=["rating_count", "id"],
+                name="title_rating_count_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
+SCORES = range(1, 11)
+
+
+def score_count_field(score):
+    return models.PositiveIntegerField(
+        default=0, verbose_name=f"Число оценок {score}"
+    )
+
+
+class TitleStats(models.Model):
+    """Модель распределения оценок произведения."""
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Произведение",
+    )
+    score_1 = score_count_field(1)
+    score_2 = score_count_field(2)
+    score_3 = score_count_field(3)
+    score_4 = score_count_field(4)
+    score_5 = score_count_field(5)
+    score_6 = score_count_field(6)
+    score_7 = score_count_field(7)
+    score_8 = score_count_field(8)
+    score_9 = score_count_field(9)
+    score_10 = score_count_field(10)
+
+    class Meta:
+        verbose_name = "Статистика оценок"
+        verbose_name_plural = "Статистика оценок"
+
+    def __str__(self):
+        return f"{self.title_id}: {self.histogram}"
+
+    @property
+    def histogram(self):
+        return {score: getattr(self, f"score_{score}") for score in SCORES}
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        return sum(
+            score * number for score, number in self.histogram.items()
+        ) / count
+
+    @property
+    def median(self):
+        """Медиана по гистограмме.
+
+        При чётном числе оценок — среднее двух средних значений.
+        """
+        count = self.count
+        if not count:
+            return None
+        middle = [(count - 1) // 2, count // 2]
+        values, seen = [], 0
+        for score, number in self.histogram.items():
+            seen += number
+            while middle and middle[0] < seen:
+                values.append(score)
+                middle.pop(0)
+        return sum(values) / 2
+
+
+class TitleRank(models.Model):
+    """Модель позиции произведения в рейтинге лучших.
+
+    Рейтинги строятся пакетной командой rank_titles: общий, по категории,
+    по жанру и по паре категория-жанр. Пустые category и genre означают
+    рейтинг без этого условия.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name="ranks",
+        verbose_name="Произведение",
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+        verbose_name="Категория рейтинга",
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+        verbose_name="Жанр рейтинга",
+    )
+    position = models.PositiveIntegerField(verbose_name="Место")
+
+    class Meta:
+        verbose_name = "Место в рейтинге"
+        verbose_name_plural = "Рейтинг произведений"
+        ordering = ["position"]
+        indexes = [
+            models.Index(
+                fields=["category", "genre", "position"],
+                name="title_rank_scope_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.position}. {self.title_id}"
+
+
 class GenreTitle(models.Model):
     """Модель для связи жанр-произведение."""
 
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["genre", "title"],
+                name="unique_genre_title",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} {self.genre}"
 
@@ -179,6 +329,7 @@ class Review(models.Model):
         verbose_name_plural = "Отзывы"
         ordering = [
             "-pub_date",
+            "-id",
         ]
         constraints = [
             models.UniqueConstraint(
@@ -186,6 +337,12 @@ class Review(models.Model):
                 name="unique_review",
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=["title", "-pub_date", "-id"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title}, {self.score}, {self.author}"
@@ -217,7 +374,69 @@ class Comment(models.Model):
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
-        ordering = ["pub_date"]
+        ordering = ["pub_date", "id"]
+        indexes = [
+            models.Index(
+                fields=["review", "pub_date", "id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.text
+
+
+class OutgoingEmail(models.Model):
+    """Модель письма в очереди на отправку."""
+
+    subject = models.CharField(max_length=256, verbose_name="Тема")
+    body = models.TextField(verbose_name="Текст письма")
+    from_email = models.CharField(
+        max_length=254, blank=True, verbose_name="Отправитель"
+    )
+    recipient = models.EmailField(max_length=254, verbose_name="Получатель")
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата постановки в очередь"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name="Число попыток отправки"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Время следующей попытки"
+    )
+    sent_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Дата отправки"
+    )
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+
+    class Meta:
+        verbose_name = "Письмо"
+        verbose_name_plural = "Очередь писем"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(sent_at__isnull=True),
+                name="outgoing_email_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
+
+
+class UsedConfirmationCode(models.Model):
+    """Модель использованного кода подтверждения."""
+
+    signature = models.CharField(
+        max_length=64, primary_key=True, verbose_name="Подпись кода"
+    )
+    expires = models.DateTimeField(
+        db_index=True, verbose_name="Окончание срока действия"
+    )
+
+    class Meta:
+        verbose_name = "Использованный код подтверждения"
+        verbose_name_plural = "Использованные коды подтверждения"
+
+    def __str__(self):
+        return self.signature
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(minutes=1)
+# Время, на которое обработчик забирает пачку писем для отправки.
+LEASE_TIME = timedelta(minutes=5)
+
+
+def enqueue_email(subject, body, recipient, from_email=None):
+    """Постановка письма в очередь; отправляет его команда send_outbox."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        recipient=recipient,
+        from_email=from_email or "",
+    )
+
+
+def pending_emails(max_attempts=MAX_ATTEMPTS):
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        next_attempt_at__lte=timezone.now(),
+        attempts__lt=max_attempts,
+    ).order_by("next_attempt_at", "id")
+
+
+def claim_batch(batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """Захват пачки писем на время LEASE_TIME.
+
+    Пачка блокируется через SELECT ... FOR UPDATE SKIP LOCKED там, где
+    база это поддерживает, и откладывается до конца аренды, поэтому другие
+    обработчики её не берут. Попытка засчитывается сразу: письмо, на
+    котором обработчик упал, вернётся в очередь после аренды и не будет
+    повторяться бесконечно.
+    """
+    with transaction.atomic():
+        batch = list(
+            pending_emails(max_attempts)
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        lease_until = timezone.now() + LEASE_TIME
+        for email in batch:
+            email.attempts += 1
+            email.next_attempt_at = lease_until
+        OutgoingEmail.objects.bulk_update(
+            batch, ["attempts", "next_attempt_at"]
+        )
+    return batch
+
+
+def send_batch(batch_size=100, max_attempts=MAX_ATTEMPTS, connection=None):
+    """Отправка одной пачки писем, возвращает число отправленных и ошибок.
+
+    Письма отправляются вне транзакции, после захвата пачки, а итоги
+    записываются второй короткой транзакцией, чтобы медленный SMTP не
+    держал блокировки. Письмо с ошибкой получает следующую попытку с
+    экспоненциальной задержкой.
+    """
+    batch = claim_batch(batch_size, max_attempts)
+    if not batch:
+        return 0, 0
+    connection = connection or get_connection()
+    sent, failed = [], []
+    for email in batch:
+        message = EmailMessage(
+            email.subject,
+            email.body,
+            email.from_email or None,
+            [email.recipient],
+            connection=connection,
+        )
+        try:
+            message.send()
+        except Exception as error:
+            email.last_error = str(error)
+            email.next_attempt_at = timezone.now() + RETRY_DELAY * 2 ** (
+                email.attempts - 1
+            )
+            failed.append(email)
+        else:
+            email.sent_at = timezone.now()
+            email.last_error = ""
+            sent.append(email)
+    with transaction.atomic():
+        OutgoingEmail.objects.bulk_update(
+            sent + failed, ["sent_at", "next_attempt_at", "last_error"]
+        )
+    return len(sent), len(failed)
+
+
+def deliver_outbox(batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """Отправка всех готовых писем пачками через одно соединение."""
+    total_sent = total_failed = 0
+    connection = get_connection()
+    with connection:
+        while True:
+            sent, failed = send_batch(batch_size, max_attempts, connection)
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < batch_size:
+                return total_sent, total_failed
@@ -0,0 +1,161 @@
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import GenreTitle, Title, TitleRank
+
+# Произведения без категории в массивах получают этот номер.
+NO_CATEGORY = -1
+
+
+def fetch_array(queryset, fields):
+    """Столбцы fields из queryset как массив int64 формы (n, len(fields))."""
+    values = chain.from_iterable(
+        queryset.values_list(*fields).iterator(chunk_size=10000)
+    )
+    return np.fromiter(values, dtype=np.int64).reshape(-1, len(fields))
+
+
+def weighted_ratings(sums, counts, prior):
+    """Байесовское среднее оценок произведений.
+
+    К оценкам каждого произведения добавляются prior оценок, равных
+    среднему по всем отзывам, поэтому произведение с одним отзывом не
+    обходит хорошо оценённые многими. У произведений без отзывов — NaN.
+    """
+    ratings = np.full(len(sums), np.nan)
+    total = counts.sum()
+    if not total:
+        return ratings
+    mean = sums.sum() / total
+    rated = counts > 0
+    ratings[rated] = (sums[rated] + prior * mean) / (counts[rated] + prior)
+    return ratings
+
+
+def grouped_top(order, ranks, depth, *keys):
+    """Первые depth произведений каждой группы с одинаковыми keys.
+
+    ranks — места произведений в общем рейтинге order.
+    """
+    if not len(ranks):
+        return
+    sort = np.lexsort((ranks, *reversed(keys)))
+    ranks = ranks[sort]
+    keys = np.stack([key[sort] for key in keys], axis=1)
+    starts = np.flatnonzero(
+        np.r_[True, np.any(keys[1:] != keys[:-1], axis=1)]
+    )
+    for start, end in zip(starts, np.r_[starts[1:], len(ranks)]):
+        yield (
+            tuple(keys[start].tolist()),
+            order[ranks[start:min(end, start + depth)]],
+        )
+
+
+def rank_titles(prior=None, depth=None):
+    """Пересчёт взвешенных рейтингов и таблицы лучших произведений.
+
+    Суммы и числа оценок всех произведений читаются одним запросом в
+    массивы NumPy; взвешенный рейтинг пишется только там, где он
+    изменился. Затем для общего рейтинга, каждой категории, жанра и пары
+    категория-жанр сохраняются первые depth мест. Возвращает число
+    изменённых рейтингов и число строк таблицы мест.
+    """
+    prior = settings.WEIGHTED_RATING_PRIOR if prior is None else prior
+    depth = settings.TOP_TITLES_DEPTH if depth is None else depth
+    with transaction.atomic():
+        columns = list(zip(*Title.objects.order_by("pk").values_list(
+            "pk", "rating_sum", "rating_count", "category", "weighted_rating"
+        ).iterator(chunk_size=10000))) or [()] * 5
+        pks, sums, counts = (
+            np.array(column, dtype=np.int64) for column in columns[:3]
+        )
+        categories = np.array(
+            [NO_CATEGORY if pk is None else pk for pk in columns[3]],
+            dtype=np.int64,
+        )
+        stored = np.array(
+            [np.nan if rating is None else rating for rating in columns[4]],
+            dtype=float,
+        )
+        ratings = weighted_ratings(sums, counts, prior)
+        changed = save_weighted_ratings(pks, stored, ratings)
+
+        rated = np.flatnonzero(counts > 0)
+        # Выше — больший рейтинг, затем больше оценок, затем меньший id.
+        order = rated[np.lexsort(
+            (pks[rated], -counts[rated], -ratings[rated])
+        )]
+        positions = np.full(len(pks), -1)
+        positions[order] = np.arange(len(order))
+
+        scopes = {(None, None): order[:depth]}
+        with_category = np.flatnonzero(categories[order] != NO_CATEGORY)
+        for (category,), top in grouped_top(
+            order, with_category, depth, categories[order][with_category]
+        ):
+            scopes[category, None] = top
+
+        genre_titles = fetch_array(
+            GenreTitle.objects.order_by(), ["title_id", "genre_id"]
+        )
+        title_rows = np.searchsorted(pks, genre_titles[:, 0])
+        # Связи с произведениями, добавленными после чтения списка,
+        # пропускаются до следующего пересчёта.
+        known = title_rows < len(pks)
+        known[known] = pks[title_rows[known]] == genre_titles[known, 0]
+        genre_ranks = np.full(len(genre_titles), -1)
+        genre_ranks[known] = positions[title_rows[known]]
+        kept = genre_ranks >= 0
+        genre_ranks = genre_ranks[kept]
+        genres = genre_titles[kept, 1]
+        for (genre,), top in grouped_top(order, genre_ranks, depth, genres):
+            scopes[None, genre] = top
+        genre_categories = categories[order][genre_ranks]
+        kept = genre_categories != NO_CATEGORY
+        for (category, genre), top in grouped_top(
+            order, genre_ranks[kept], depth,
+            genre_categories[kept], genres[kept],
+        ):
+            scopes[category, genre] = top
+
+        TitleRank.objects.all().delete()
+        TitleRank.objects.bulk_create(
+            (
+                TitleRank(
+                    title_id=pk,
+                    category_id=category,
+                    genre_id=genre,
+                    position=position,
+                )
+                for (category, genre), top in scopes.items()
+                for position, pk in enumerate(pks[top].tolist(), 1)
+            ),
+            batch_size=1000,
+        )
+    return changed, TitleRank.objects.count()
+
+
+def save_weighted_ratings(pks, stored, ratings):
+    """Запись взвешенных рейтингов, изменившихся с прошлого пересчёта."""
+    same = np.isclose(stored, ratings, rtol=0, atol=1e-9) | (
+        np.isnan(stored) & np.isnan(ratings)
+    )
+    changed = np.flatnonzero(~same)
+    Title.objects.bulk_update(
+        [
+            Title(
+                pk=pk,
+                weighted_rating=None if np.isnan(rating) else rating,
+            )
+            for pk, rating in zip(
+                pks[changed].tolist(), ratings[changed].tolist()
+            )
+        ],
+        ["weighted_rating"],
+        batch_size=1000,
+    )
+    return len(changed)
@@ -0,0 +1,142 @@
+from itertools import chain
+
+import numpy as np
+from django.db import transaction
+from django.db.models import (Count, F, FloatField, IntegerField, OuterRef,
+                              Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .generations import bump_on_commit
+from .models import SCORES, Review, Title, TitleStats
+
+SCORE_FIELDS = [f"score_{score}" for score in SCORES]
+
+
+def average_rating(rating_sum, rating_count):
+    """Средняя оценка из выражений суммы и числа оценок; NULL без оценок."""
+    return Cast(rating_sum, FloatField()) / NullIf(rating_count, 0)
+
+
+def update_title_rating(title_id, score_delta, count_delta=0):
+    """Инкрементальное обновление сохранённого рейтинга произведения."""
+    rating_sum = F("rating_sum") + score_delta
+    rating_count = F("rating_count") + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=average_rating(rating_sum, rating_count),
+    )
+
+
+def title_histogram(title_id):
+    """Числа оценок произведения по отзывам как поля TitleStats."""
+    return {
+        f"score_{score}": total
+        for score, total in Review.objects.filter(
+            title_id=title_id, score__range=(1, len(SCORES))
+        ).order_by().values("score").annotate(
+            total=Count("pk")
+        ).values_list("score", "total")
+    }
+
+
+def update_title_stats(title_id, added=None, removed=None):
+    """Инкрементальное обновление распределения оценок произведения.
+
+    added и removed — добавленная и убранная оценка, уже записанная в
+    отзывы. Если строки статистики у произведения ещё нет, она создаётся
+    по отзывам; если её первой создала параллельная транзакция, изменение
+    применяется к созданной строке.
+    """
+    changes = {}
+    for score, delta in ((added, 1), (removed, -1)):
+        if score is not None:
+            field = f"score_{score}"
+            changes[field] = changes.get(field, 0) + delta
+    changes = {
+        field: F(field) + delta for field, delta in changes.items() if delta
+    }
+    if not changes:
+        return
+    stats = TitleStats.objects.filter(title_id=title_id)
+    if stats.update(**changes):
+        return
+    _, created = TitleStats.objects.get_or_create(
+        title_id=title_id, defaults=title_histogram(title_id)
+    )
+    if not created:
+        stats.update(**changes)
+
+
+def rebuild_title_stats(title_ids=None):
+    """Пересчёт распределений оценок по таблице отзывов.
+
+    Пары (произведение, оценка) читаются одним запросом в массив NumPy и
+    раскладываются по гистограммам через bincount; строки статистики
+    заменяются пачками. Возвращает число пересчитанных произведений.
+    """
+    titles = Title.objects.order_by("pk")
+    reviews = Review.objects.filter(score__range=(1, len(SCORES))).order_by()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+        reviews = reviews.filter(title_id__in=title_ids)
+    with transaction.atomic():
+        title_pks = np.fromiter(
+            titles.values_list("pk", flat=True).iterator(), dtype=np.int64
+        )
+        pairs = np.fromiter(
+            chain.from_iterable(
+                reviews.values_list("title_id", "score").iterator()
+            ),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        rows = np.searchsorted(title_pks, pairs[:, 0])
+        histograms = np.bincount(
+            rows * len(SCORES) + pairs[:, 1] - 1,
+            minlength=len(title_pks) * len(SCORES),
+        ).reshape(-1, len(SCORES))
+        stats = [
+            TitleStats(title_id=pk, **dict(zip(SCORE_FIELDS, histogram)))
+            for pk, histogram in zip(title_pks.tolist(), histograms.tolist())
+        ]
+        old_stats = TitleStats.objects.all()
+        if title_ids is not None:
+            old_stats = old_stats.filter(title_id__in=title_ids)
+        old_stats.delete()
+        TitleStats.objects.bulk_create(stats, batch_size=1000)
+    return len(stats)
+
+
+def rebuild_title_ratings(title_ids=None):
+    """Пересчёт сохранённых рейтингов и распределений оценок по отзывам."""
+    reviews = Review.objects.filter(title=OuterRef("pk")).order_by()
+    titles = Title.objects.all()
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+    with transaction.atomic():
+        bump_on_commit(Title)
+        rebuild_title_stats(title_ids)
+        updated = titles.update(
+            rating_sum=Coalesce(
+                Subquery(
+                    reviews.values("title")
+                    .annotate(total=Sum("score"))
+                    .values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            ),
+            rating_count=Coalesce(
+                Subquery(
+                    reviews.values("title")
+                    .annotate(total=Count("pk"))
+                    .values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            ),
+        )
+        titles.update(
+            rating=average_rating(F("rating_sum"), F("rating_count"))
+        )
+    return updated
@@ -0,0 +1,168 @@
+from django.db import connection, transaction
+from django.db.models import (Case, F, FloatField, IntegerField, Q, Value,
+                              When)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length
+from django.utils.html import escape
+
+from .fts import fts_table
+from .models import Comment, Review, Title
+
+TITLE_FTS_TABLE = fts_table(Title._meta.db_table)
+TEXT_FTS_TABLES = {
+    model: fts_table(model._meta.db_table) for model in (Review, Comment)
+}
+TEXT_SEARCH_CONFIG = "russian"
+HIGHLIGHT_START, HIGHLIGHT_STOP = "<mark>", "</mark>"
+# База отмечает найденные слова символами из области личного пользования,
+# а теги подставляются после экранирования текста.
+MARK_START, MARK_STOP = "\ue000", "\ue001"
+SNIPPET_TOKENS = 32
+# Триграммный индекс находит только подстроки хотя бы из трёх символов.
+MIN_INDEXED_QUERY = 3
+
+_fts_available = {}
+
+
+def fts_available(table):
+    """Есть ли в текущей базе SQLite полнотекстовая таблица table."""
+    key = (connection.alias, connection.settings_dict["NAME"], table)
+    if key not in _fts_available:
+        _fts_available[key] = (
+            table in connection.introspection.table_names()
+        )
+    return _fts_available[key]
+
+
+def fts_phrase(query):
+    return '"{}"'.format(query.replace('"', '""'))
+
+
+def fts_terms(query):
+    """Запрос FTS5 из слов пользователя: все слова обязательны."""
+    return " ".join(fts_phrase(word) for word in query.split())
+
+
+def search_titles(queryset, query):
+    """Поиск произведений по подстроке названия с ранжированием.
+
+    На PostgreSQL icontains сравнивает UPPER(name) LIKE и идёт по
+    GIN-индексу pg_trgm на том же выражении, на SQLite подстрока ищется
+    через триграммную таблицу FTS5; короткие запросы и базы без
+    индекса обходятся обычным icontains. Результат упорядочен по
+    релевантности: точное совпадение, затем начало названия, затем более
+    короткие названия.
+    """
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        return queryset.filter(name__icontains=query).annotate(
+            relevance=TrigramSimilarity("name", query)
+        ).order_by("-relevance", "id")
+    if (
+        connection.vendor == "sqlite"
+        and len(query) >= MIN_INDEXED_QUERY
+        and fts_available(TITLE_FTS_TABLE)
+    ):
+        queryset = queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {TITLE_FTS_TABLE} "
+            f"WHERE {TITLE_FTS_TABLE} MATCH %s",
+            (fts_phrase(query),),
+        ))
+    else:
+        queryset = queryset.filter(name__icontains=query)
+    # LIKE в SQLite не различает регистр только для латиницы, поэтому
+    # отдельно сравнивается вариант запроса с заглавной буквы.
+    capitalized = query[:1].upper() + query[1:]
+    return queryset.annotate(
+        relevance=Case(
+            When(Q(name__iexact=query) | Q(name=capitalized), then=Value(2)),
+            When(
+                Q(name__istartswith=query) | Q(name__startswith=capitalized),
+                then=Value(1),
+            ),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    ).order_by("-relevance", Length("name"), "id")
+
+
+def search_texts(queryset, query):
+    """Полнотекстовый поиск отзывов или комментариев с подсветкой.
+
+    На PostgreSQL используется tsvector по GIN-индексу, на SQLite —
+    таблица FTS5; базы без индекса обходятся icontains. Каждый объект
+    получает relevance (больше — выше) и highlight — фрагмент текста с
+    найденными словами между MARK_START и MARK_STOP; HTML из него строит
+    render_highlight.
+    """
+    model = queryset.model
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import (SearchHeadline,
+                                                    SearchQuery, SearchRank,
+                                                    SearchVector)
+
+        vector = SearchVector("text", config=TEXT_SEARCH_CONFIG)
+        search_query = SearchQuery(query, config=TEXT_SEARCH_CONFIG)
+        return queryset.annotate(document=vector).filter(
+            document=search_query
+        ).annotate(
+            relevance=SearchRank(vector, search_query),
+            highlight=SearchHeadline(
+                "text",
+                search_query,
+                config=TEXT_SEARCH_CONFIG,
+                start_sel=MARK_START,
+                stop_sel=MARK_STOP,
+                max_words=SNIPPET_TOKENS,
+            ),
+        ).order_by("-relevance", "-id")
+    table = TEXT_FTS_TABLES[model]
+    terms = fts_terms(query)
+    if connection.vendor == "sqlite" and terms and fts_available(table):
+        # Ранг и фрагмент — вспомогательные функции FTS5, доступные только
+        # при соединении с самой таблицей, поэтому здесь нужен extra().
+        return queryset.extra(
+            select={
+                "relevance": f"-{table}.rank",
+                "highlight": f"snippet({table}, 0, %s, %s, %s, %s)",
+            },
+            select_params=(MARK_START, MARK_STOP, "…", SNIPPET_TOKENS),
+            tables=[table],
+            where=[
+                f"{table}.rowid = {model._meta.db_table}.id",
+                f"{table} MATCH %s",
+            ],
+            params=[terms],
+        ).order_by("-relevance", "-id")
+    return queryset.filter(text__icontains=query).annotate(
+        relevance=Value(0.0, output_field=FloatField()),
+        highlight=F("text"),
+    ).order_by("-id")
+
+
+def render_highlight(fragment):
+    """HTML фрагмента: текст экранирован, найденные слова — в <mark>."""
+    return escape(fragment).replace(
+        MARK_START, HIGHLIGHT_START
+    ).replace(MARK_STOP, HIGHLIGHT_STOP)
+
+
+def rebuild_search_index():
+    """Перестроение полнотекстовых таблиц SQLite по текущим данным.
+
+    Возвращает список перестроенных таблиц; на PostgreSQL индексы по
+    выражению поддерживаются самой базой и перестраивать нечего.
+    """
+    if connection.vendor != "sqlite":
+        return []
+    tables = [
+        table for table in (TITLE_FTS_TABLE, *TEXT_FTS_TABLES.values())
+        if fts_available(table)
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(
+                f"INSERT INTO {table} ({table}) VALUES ('rebuild')"
+            )
+    return tables
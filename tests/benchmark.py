@@ -0,0 +1,270 @@
+import gc
+import io
+import itertools
+import json
+import math
+import os
+import statistics
+import time
+import tracemalloc
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json'
+)
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+# Размер синтетического набора данных. По умолчанию он небольшой, чтобы
+# бенчмарк укладывался в обычный прогон тестов; для нагрузочного прогона
+# задайте, например, YAMDB_BENCH_TITLES=100000 YAMDB_BENCH_REVIEWS=5000000.
+BENCH_TITLES = env_int('YAMDB_BENCH_TITLES', 200)
+BENCH_USERS = env_int('YAMDB_BENCH_USERS', 50)
+BENCH_REVIEWS = env_int('YAMDB_BENCH_REVIEWS', 2000)
+BENCH_COMMENTS = env_int('YAMDB_BENCH_COMMENTS', 500)
+BENCH_REPEAT = env_int('YAMDB_BENCH_REPEAT', 20)
+BENCH_BATCH_SIZE = env_int('YAMDB_BENCH_BATCH_SIZE', 10000)
+BENCH_SEED = env_int('YAMDB_BENCH_SEED', 1)
+LATENCY_TOLERANCE = env_float('YAMDB_BENCH_LATENCY_TOLERANCE', 5.0)
+LATENCY_SLACK_MS = env_float('YAMDB_BENCH_LATENCY_SLACK_MS', 50.0)
+ALLOC_TOLERANCE = env_float('YAMDB_BENCH_ALLOC_TOLERANCE', 1.5)
+UPDATE_BASELINE = os.getenv('YAMDB_BENCH_UPDATE') == '1'
+# Задержка и аллокации зависят от машины и шумят на общих CI-раннерах,
+# поэтому по умолчанию проверяется только число запросов.
+STRICT = os.getenv('YAMDB_BENCH_STRICT') == '1'
+REPORT_PATH = os.getenv('YAMDB_BENCH_REPORT')
+
+
+def seed_dataset():
+    from reviews.autocomplete import autocomplete_index
+    from reviews.management.commands.generate_fake_data import WORDS
+    from reviews.models import Comment, GenreTitle, Review, Title
+
+    call_command(
+        'generate_fake_data',
+        users=BENCH_USERS,
+        titles=BENCH_TITLES,
+        reviews=BENCH_REVIEWS,
+        comments=BENCH_COMMENTS,
+        batch_size=BENCH_BATCH_SIZE,
+        seed=BENCH_SEED,
+        stdout=io.StringIO(),
+    )
+    call_command('rank_titles', stdout=io.StringIO())
+    # Без готового индекса подсказки пусты, пока он строится в фоне.
+    autocomplete_index.rebuild()
+    # Самое популярное произведение и самый обсуждаемый отзыв дают худший
+    # случай для списков отзывов и комментариев.
+    title = Title.objects.select_related('category').order_by(
+        '-rating_count'
+    ).first()
+    review_id = (
+        Comment.objects.values('review')
+        .annotate(total=Count('id'))
+        .order_by('-total')
+        .values_list('review', flat=True)
+        .first()
+    )
+    genre_title = GenreTitle.objects.select_related('genre').filter(
+        title=title
+    ).first()
+    return {
+        'title_id': title.id,
+        'review_title_id': Review.objects.values_list(
+            'title', flat=True
+        ).get(pk=review_id),
+        'review_id': review_id,
+        'genre': genre_title.genre.slug,
+        'category': title.category.slug,
+        'prefix': title.name[:3],
+        # Первое слово названия не короче MIN_INDEXED_QUERY, поэтому
+        # поиск по названию идёт через индекс, а не icontains.
+        'name_word': title.name.split()[0],
+        'word': WORDS[0],
+    }
+
+
+def build_scenarios(dataset, user):
+    """Маршруты из api/urls.py, которые воспроизводит бенчмарк."""
+    title_url = f'/api/v1/titles/{dataset["title_id"]}/'
+    review_url = (
+        f'/api/v1/titles/{dataset["review_title_id"]}/reviews/'
+        f'{dataset["review_id"]}/'
+    )
+    signup_counter = itertools.count()
+
+    def signup():
+        idx = next(signup_counter)
+        return {
+            'username': f'bench_signup_{idx}',
+            'email': f'bench_signup_{idx}@yamdb.fake',
+        }
+
+    def token():
+        from api.confirmation import make_confirmation_code
+
+        return {
+            'username': user.username,
+            'confirmation_code': make_confirmation_code(user),
+        }
+
+    return (
+        ('titles_list', 'anon', 'get', '/api/v1/titles/', None),
+        ('titles_filter', 'anon', 'get',
+         f'/api/v1/titles/?genre={dataset["genre"]}'
+         f'&category={dataset["category"]}', None),
+        ('titles_search', 'anon', 'get',
+         f'/api/v1/titles/?name={dataset["name_word"]}', None),
+        ('title_detail', 'anon', 'get', title_url, None),
+        ('title_stats', 'anon', 'get', f'{title_url}stats/', None),
+        ('titles_top', 'anon', 'get',
+         f'/api/v1/titles/top/?genre={dataset["genre"]}', None),
+        ('autocomplete', 'anon', 'get',
+         f'/api/v1/autocomplete/?q={dataset["prefix"]}', None),
+        ('categories_list', 'anon', 'get', '/api/v1/categories/', None),
+        ('genres_list', 'anon', 'get', '/api/v1/genres/', None),
+        ('reviews_list', 'anon', 'get', f'{title_url}reviews/', None),
+        ('review_detail', 'anon', 'get', review_url, None),
+        ('comments_list', 'anon', 'get', f'{review_url}comments/', None),
+        ('reviews_search', 'anon', 'get',
+         f'/api/v1/search/reviews/?q={dataset["word"]}', None),
+        ('comments_search', 'anon', 'get',
+         f'/api/v1/search/comments/?q={dataset["word"]}', None),
+        ('users_list', 'admin', 'get', '/api/v1/users/', None),
+        ('users_me', 'user', 'get', '/api/v1/users/me/', None),
+        ('signup', 'anon', 'post', '/api/v1/auth/signup/', signup),
+        ('token', 'anon', 'post', '/api/v1/auth/token/', token),
+    )
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def call(clients, role, method, url, data):
+    payload = data() if data else None
+    response = getattr(clients[role], method)(url, data=payload)
+    assert response.status_code < 300, (
+        f'Бенчмарк: {method.upper()}-запрос к `{url}` вернул ответ со '
+        f'статусом {response.status_code}.'
+    )
+    return response
+
+
+def measure(clients, scenario):
+    from reviews.generations import bump_epoch
+
+    name, role, method, url, data = scenario
+    call(clients, role, method, url, data)
+
+    # Запросы считаются на холодном кэше: смена эпохи сбрасывает страницы
+    # списков и пользователей, иначе попадание в кэш давало бы 0 запросов.
+    bump_epoch()
+    with CaptureQueriesContext(connection) as context:
+        call(clients, role, method, url, data)
+    queries = len(context.captured_queries)
+
+    tracemalloc.start()
+    try:
+        call(clients, role, method, url, data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Как и timeit, сборщик мусора на время замеров отключается, чтобы
+    # случайная сборка не попадала в задержку отдельного эндпоинта.
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(BENCH_REPEAT):
+            started = time.perf_counter()
+            call(clients, role, method, url, data)
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        gc.enable()
+
+    return name, {
+        'queries': queries,
+        'p50_ms': round(statistics.median(samples), 3),
+        'p99_ms': round(percentile(samples, 0.99), 3),
+        'alloc_kib': round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(clients, scenarios):
+    return dict(measure(clients, scenario) for scenario in scenarios)
+
+
+def load_baseline():
+    with open(BASELINE_PATH, encoding='utf8') as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_results(path, results):
+    with open(path, 'w', encoding='utf8') as results_file:
+        json.dump(results, results_file, indent=4, sort_keys=True)
+        results_file.write('\n')
+
+
+def format_report(results):
+    lines = [
+        f'{"endpoint":<16}{"queries":>8}{"p50, ms":>10}{"p99, ms":>10}'
+        f'{"alloc, KiB":>12}'
+    ]
+    for name, result in results.items():
+        lines.append(
+            f'{name:<16}{result["queries"]:>8}{result["p50_ms"]:>10}'
+            f'{result["p99_ms"]:>10}{result["alloc_kib"]:>12}'
+        )
+    return '\n'.join(lines)
+
+
+def compare_with_baseline(results, baseline, strict=STRICT):
+    failures = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            failures.append(
+                f'{name}: нет записи в {BASELINE_PATH}, обновите базовую '
+                'линию с YAMDB_BENCH_UPDATE=1.'
+            )
+            continue
+        if result['queries'] > expected['queries']:
+            failures.append(
+                f'{name}: {result["queries"]} SQL-запросов при базовой '
+                f'линии {expected["queries"]}.'
+            )
+        if not strict:
+            continue
+        # Задержка зависит от машины, поэтому к кратному допуску
+        # добавляется абсолютный запас на шум планировщика и GC.
+        latency_limit = max(
+            expected['p99_ms'] * LATENCY_TOLERANCE,
+            expected['p99_ms'] + LATENCY_SLACK_MS,
+        )
+        if result['p99_ms'] > latency_limit:
+            failures.append(
+                f'{name}: p99 {result["p99_ms"]} мс при базовой линии '
+                f'{expected["p99_ms"]} мс (допуск до {latency_limit} мс).'
+            )
+        if result['alloc_kib'] > expected['alloc_kib'] * ALLOC_TOLERANCE:
+            failures.append(
+                f'{name}: пик аллокаций {result["alloc_kib"]} КиБ при '
+                f'базовой линии {expected["alloc_kib"]} КиБ '
+                f'(допуск x{ALLOC_TOLERANCE}).'
+            )
+    return failures
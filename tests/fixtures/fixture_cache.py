@@ -0,0 +1,25 @@
+import pytest
+from django.test import override_settings
+
+CACHE_PREFIXES = {
+    'default': 'CACHE',
+    'generations': 'GENERATIONS_CACHE',
+}
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_caches(tmp_path_factory):
+    """Кэши тестов во временных каталогах, а не в api_yamdb/cache.
+
+    Переменные окружения передают те же каталоги подпроцессам.
+    """
+    from django.conf import settings
+
+    caches = {}
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for alias, prefix in CACHE_PREFIXES.items():
+            location = str(tmp_path_factory.mktemp(f'cache_{alias}'))
+            caches[alias] = {**settings.CACHES[alias], 'LOCATION': location}
+            monkeypatch.setenv(f'{prefix}_LOCATION', location)
+        with override_settings(CACHES=caches):
+            yield
@@ -1,7 +1,10 @@
+import io
 from http import HTTPStatus
 
 import pytest
 from django.core import mail
+from django.core.cache import caches
+from django.core.management import call_command
 from django.db.utils import IntegrityError
 
 from tests.utils import (invalid_data_for_user_patch_and_creation,
@@ -110,6 +113,8 @@ class Test00UserRegistration:
         }
 
         response = client.post(self.url_signup, data=valid_data)
+        # Письма отправляются из очереди отдельным обработчиком.
+        call_command('send_outbox', stdout=io.StringIO())
         outbox_after = mail.outbox  # email outbox after user create
 
         assert response.status_code != HTTPStatus.NOT_FOUND, (
@@ -159,6 +164,7 @@ class Test00UserRegistration:
         response = admin_client.post(
             self.url_admin_create_user, data=valid_data
         )
+        call_command('send_outbox', stdout=io.StringIO())
         outbox_after = mail.outbox
 
         assert response.status_code != HTTPStatus.NOT_FOUND, (
@@ -373,3 +379,44 @@ class Test00UserRegistration:
             'пользователя, созданного администратором,  возвращает ответ '
             'со статусом 200.'
         )
+
+    def test_obtain_token_with_confirmation_code(self, client, settings):
+        from api.confirmation import make_confirmation_code
+        from reviews.models import User
+
+        valid_data = {
+            'email': 'test_email@yamdb.fake',
+            'username': 'valid_username_1'
+        }
+        client.post(self.url_signup, data=valid_data)
+        call_command('send_outbox', stdout=io.StringIO())
+        code = mail.outbox[-1].body.rsplit(' ', 1)[-1]
+        response = client.post(self.url_token, data={
+            'username': valid_data['username'], 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.OK and (
+            'token' in response.json()
+        ), (
+            f'Проверьте, что POST-запрос к `{self.url_token}` с кодом из '
+            'письма возвращает токен.'
+        )
+        # Очистка или вытеснение кэша не должны открывать код повторно.
+        for cache in caches.all():
+            cache.clear()
+        response = client.post(self.url_token, data={
+            'username': valid_data['username'], 'confirmation_code': code
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения можно использовать только '
+            'один раз.'
+        )
+
+        user = User.objects.get(username=valid_data['username'])
+        settings.CONFIRMATION_CODE_TIMEOUT = 0
+        response = client.post(self.url_token, data={
+            'username': user.username,
+            'confirmation_code': make_confirmation_code(user)
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что просроченный код подтверждения не принимается.'
+        )
@@ -316,3 +316,128 @@ class Test04TitleAPI:
                           HTTPStatus.FORBIDDEN)
         check_permissions(moderator_client, url, data, 'модератора',
                           titles, HTTPStatus.FORBIDDEN)
+
+    def test_06_titles_query_count(self, client, admin_client,
+                                   django_assert_num_queries):
+        titles, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        for idx in range(20):
+            admin_client.post(url, data={
+                'name': f'Произведение {idx}',
+                'year': 2000,
+                'genre': [genres[0]['slug'], genres[2]['slug']],
+                'category': categories[idx % 2]['slug'],
+            })
+
+        # COUNT для пагинации, выборка произведений с категориями и
+        # одна выборка жанров для всей страницы.
+        for limit in (1, 10, 22):
+            with django_assert_num_queries(3):
+                response = client.get(f'{url}?limit={limit}')
+            assert len(response.json()['results']) == limit, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает страницу '
+                'запрошенного размера.'
+            )
+        with django_assert_num_queries(3):
+            client.get(f'{url}?genre={genres[0]["slug"]}')
+        with django_assert_num_queries(2):
+            client.get(f'{url}{titles[0]["id"]}/')
+
+    def test_07_titles_name_search(self, client):
+        from django.db import connection
+        from reviews.models import Title
+
+        for name in ('Война и мир', 'Мир', 'Мирный атом', 'Пир', 'Ми'):
+            Title.objects.create(name=name, year=2000)
+        url = '/api/v1/titles/'
+
+        response = client.get(f'{url}?name=мир')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Мир', 'Мирный атом', 'Война и мир'], (
+            f'Проверьте, что фильтр `name` эндпоинта `{url}` находит '
+            'произведения по подстроке названия и упорядочивает их по '
+            'релевантности: точное совпадение, начало названия, остальные.'
+        )
+
+        Title.objects.filter(name='Пир').update(name='Пир во время чумы')
+        Title.objects.filter(name='Мир').delete()
+        response = client.get(f'{url}?name=во время')
+        names = [title['name'] for title in response.json()['results']]
+        assert names == ['Пир во время чумы'], (
+            'Проверьте, что индекс поиска по названию обновляется при '
+            'изменении и удалении произведений.'
+        )
+        response = client.get(f'{url}?name=ат')
+        assert response.json()['count'] == 1, (
+            'Проверьте, что короткие запросы фильтра `name` тоже работают.'
+        )
+
+        if connection.vendor == 'sqlite':
+            from reviews.search import search_titles
+            plan = search_titles(Title.objects.all(), 'мир').explain()
+            assert 'reviews_title_fts' in plan, (
+                'Проверьте, что поиск по названию на SQLite использует '
+                'полнотекстовую таблицу FTS5.'
+            )
+        if connection.vendor == 'postgresql':
+            from django.db import transaction
+            from reviews.search import search_titles
+            with transaction.atomic():
+                # На нескольких строках полный просмотр дешевле индекса.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+                plan = search_titles(Title.objects.all(), 'мир').explain()
+            assert 'title_name_trgm_idx' in plan, (
+                'Проверьте, что поиск по названию на PostgreSQL использует '
+                'триграммный GIN-индекс.'
+            )
+
+    def test_08_titles_ordering(self, client, django_user_model):
+        from django.core.management import call_command
+        from reviews.models import Review, Title
+
+        titles = [
+            Title.objects.create(name=name, year=year)
+            for name, year in (
+                ('Б', 2001), ('В', 1999), ('А', 2000), ('Г', 1998)
+            )
+        ]
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(3)
+        ]
+        for title, scores in zip(titles, ([4, 6], [9], [7])):
+            for author, score in zip(authors, scores):
+                Review.objects.create(
+                    title=title, author=author, text='text', score=score
+                )
+        call_command('rebuild_title_ratings')
+
+        def names(query=''):
+            response = client.get(f'/api/v1/titles/{query}')
+            assert response.status_code == HTTPStatus.OK
+            return [title['name'] for title in response.json()['results']]
+
+        assert names() == ['Б', 'В', 'А', 'Г'], (
+            'Проверьте, что без параметра `ordering` произведения '
+            'упорядочены по id.'
+        )
+        expected = {
+            'name': ['А', 'Б', 'В', 'Г'],
+            '-year': ['Б', 'А', 'В', 'Г'],
+            'rating': ['Г', 'Б', 'А', 'В'],
+            '-rating': ['В', 'А', 'Б', 'Г'],
+            'review_count': ['Г', 'В', 'А', 'Б'],
+        }
+        for ordering, expected_names in expected.items():
+            assert names(f'?ordering={ordering}') == expected_names, (
+                'Проверьте, что эндпоинт `/api/v1/titles/` поддерживает '
+                f'сортировку `ordering={ordering}`.'
+            )
+        response = client.get('/api/v1/titles/?ordering=description')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что сортировка по неподдерживаемому полю возвращает '
+            'ответ со статусом 400.'
+        )
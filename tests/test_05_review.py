@@ -384,3 +384,82 @@ class Test05ReviewAPI:
                 f'Проверьте, что DELETE-запрос {role} к чужому отзыву через '
                 f'`{url_template}` удаляет отзыв.'
             )
+
+    def test_06_reviews_cursor_pagination(self, client, admin):
+        from django.utils import timezone
+        from reviews.models import Review, Title, User
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        pub_date = timezone.now()
+        for idx in range(25):
+            author = User.objects.create(
+                username=f'author_{idx}', email=f'author_{idx}@yamdb.fake'
+            )
+            review = Review.objects.create(
+                title=title, author=author, text='text', score=5
+            )
+            # Половина отзывов с одинаковой датой: порядок внутри неё
+            # определяется id.
+            if idx % 2:
+                Review.objects.filter(pk=review.pk).update(pub_date=pub_date)
+        expected = list(
+            Review.objects.filter(title=title)
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=10'
+        received = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация отзывов не считает '
+                'общее число записей.'
+            )
+            received.extend(review['id'] for review in data['results'])
+            url = data['next']
+        assert received == expected, (
+            'Проверьте, что курсорная пагинация отзывов возвращает все '
+            'отзывы без пропусков и повторов в порядке (-pub_date, -id).'
+        )
+
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?limit=10&offset=20'
+        )
+        data = response.json()
+        assert data['count'] == 25, (
+            'Проверьте, что без параметра `cursor` сохраняется пагинация '
+            'limit/offset.'
+        )
+        assert [review['id'] for review in data['results']] == expected[20:]
+
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=broken'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что запрос с некорректным курсором возвращает ответ '
+            'со статусом 404.'
+        )
+
+    def test_07_reviews_page_query_count(self, client, django_user_model,
+                                         django_assert_num_queries):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        for idx in range(8):
+            author = django_user_model.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=str(idx), score=5
+            )
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        client.get(url)
+        # Произведение, число отзывов и страница с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(f'{url}?limit=8&offset=0')
+        assert len(response.json()['results']) == 8, (
+            'Проверьте, что авторы отзывов загружаются тем же запросом, что '
+            'и страница, а не отдельным запросом на каждый отзыв.'
+        )
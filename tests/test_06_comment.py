@@ -381,3 +381,57 @@ class Test06CommentAPI:
             'Проверьте, что DELETE-запрос неавторизованного пользователя к '
             f'`{url}` возвращает ответ со статусом 401.'
         )
+
+    def test_07_comments_cursor_pagination(self, client, admin):
+        from reviews.models import Comment, Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=admin, text='text', score=5
+        )
+        for idx in range(15):
+            Comment.objects.create(review=review, author=admin, text=str(idx))
+        expected = list(
+            Comment.objects.filter(review=review)
+            .order_by('pub_date', 'id').values_list('id', flat=True)
+        )
+
+        url = (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?cursor=&limit=4'
+        )
+        received = []
+        while url:
+            data = client.get(url).json()
+            received.extend(comment['id'] for comment in data['results'])
+            url = data['next']
+        assert received == expected, (
+            'Проверьте, что курсорная пагинация комментариев возвращает все '
+            'комментарии в порядке публикации.'
+        )
+
+    def test_08_comment_review_from_other_title(self, admin_client, admin):
+        from reviews.models import Comment, Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        other_title = Title.objects.create(name='Другое', year=2001)
+        review = Review.objects.create(
+            title=title, author=admin, text='text', score=5
+        )
+        comment = Comment.objects.create(
+            review=review, author=admin, text='comment'
+        )
+        url = f'/api/v1/titles/{other_title.id}/reviews/{review.id}/comments/'
+
+        response = admin_client.post(url, data={'text': 'comment'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарий нельзя добавить к отзыву через '
+            'адрес другого произведения.'
+        )
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        response = admin_client.get(f'{url}{comment.id}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарий не отдаётся по адресу другого '
+            'произведения.'
+        )
+        assert Comment.objects.count() == 1
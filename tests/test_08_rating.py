@@ -0,0 +1,139 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user,
+                                              moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            f'создании отзыва через `{url}`.'
+        )
+
+        user_client.patch(f'{url}{reviews[1]["id"]}/', data={'score': 8})
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            f'изменении оценки отзыва через `{url}{{review_id}}/`.'
+        )
+
+        moderator_client.delete(f'{url}{reviews[2]["id"]}/')
+        assert self.get_rating(admin_client, title_id) == 6.5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            f'удалении отзыва через `{url}{{review_id}}/`.'
+        )
+
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении автора отзыва.'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None, (
+            'Рейтинг произведения без отзывов должен быть `None`.'
+        )
+
+    def test_02_rebuild_title_ratings(self, admin_client, admin, user_client,
+                                      user):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+
+        from reviews.models import Title
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('rebuild_title_ratings')
+
+        assert self.get_rating(admin_client, titles[0]['id']) == 5, (
+            'Проверьте, что команда `rebuild_title_ratings` восстанавливает '
+            'рейтинг произведений по отзывам.'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None, (
+            'Проверьте, что команда `rebuild_title_ratings` обнуляет рейтинг '
+            'произведений без отзывов.'
+        )
+
+    def test_03_stale_review_instances(self, admin, user):
+        from types import SimpleNamespace
+
+        from api.serializers import ReviewSerializer
+        from api.views import ReviewViewSet
+        from rest_framework.exceptions import NotFound
+        from reviews.models import Review, Title, TitleStats
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        view = ReviewViewSet(kwargs={'title_id': title.id})
+        for author, score in ((admin, 4), (user, 6)):
+            view.request = SimpleNamespace(user=author)
+            serializer = ReviewSerializer(
+                data={'text': 'a', 'score': score},
+                context={'request': view.request},
+            )
+            serializer.is_valid(raise_exception=True)
+            view.perform_create(serializer)
+        review_id = Review.objects.get(author=user).id
+
+        # Два параллельных запроса прочитали отзыв до изменений друг друга.
+        first, second = (Review.objects.get(pk=review_id) for _ in range(2))
+        context = {'request': SimpleNamespace(user=user)}
+        for instance, score in ((first, 8), (second, 3)):
+            serializer = ReviewSerializer(
+                instance, data={'score': score}, partial=True,
+                context=context,
+            )
+            serializer.is_valid(raise_exception=True)
+            view.perform_update(serializer)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (7, 2), (
+            'Проверьте, что изменение отзыва считает разницу оценок от '
+            'сохранённой в базе оценки, а не от прочитанной ранее.'
+        )
+
+        view.perform_destroy(first)
+        with pytest.raises(NotFound):
+            view.perform_destroy(second)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (4, 1), (
+            'Проверьте, что повторное удаление того же отзыва не уменьшает '
+            'рейтинг произведения второй раз.'
+        )
+        assert TitleStats.objects.get(title=title).histogram[4] == 1
+        assert TitleStats.objects.get(title=title).count == 1
+
+    def test_04_only_duplicates_become_validation_errors(self, admin):
+        from types import SimpleNamespace
+        from unittest import mock
+
+        from api.views import ReviewViewSet
+        from django.db import IntegrityError
+        from rest_framework.exceptions import ValidationError
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        view = ReviewViewSet(kwargs={'title_id': title.id})
+        view.request = SimpleNamespace(user=admin)
+        serializer = mock.Mock()
+        serializer.save.side_effect = IntegrityError('NOT NULL')
+        with pytest.raises(IntegrityError):
+            view.perform_create(serializer)
+
+        Review.objects.create(title=title, author=admin, text='a', score=5)
+        serializer.save.side_effect = IntegrityError('unique_review')
+        with pytest.raises(ValidationError):
+            view.perform_create(serializer)
@@ -0,0 +1,33 @@
+import pytest
+from rest_framework.test import APIClient
+
+from tests.benchmark import (BASELINE_PATH, REPORT_PATH, UPDATE_BASELINE,
+                             build_scenarios, compare_with_baseline,
+                             format_report, load_baseline, run_benchmark,
+                             save_results, seed_dataset)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09Benchmark:
+
+    def test_01_endpoints_within_baseline(self, admin_client, user_client,
+                                          user, pytestconfig):
+        dataset = seed_dataset()
+        clients = {
+            'anon': APIClient(),
+            'admin': admin_client,
+            'user': user_client,
+        }
+        results = run_benchmark(clients, build_scenarios(dataset, user))
+        if pytestconfig.getoption('capture') == 'no':
+            print(format_report(results))
+        if REPORT_PATH:
+            save_results(REPORT_PATH, results)
+        if UPDATE_BASELINE:
+            save_results(BASELINE_PATH, results)
+
+        failures = compare_with_baseline(results, load_baseline())
+        assert not failures, (
+            'Производительность эндпоинтов хуже базовой линии:\n'
+            + '\n'.join(failures)
+        )
@@ -0,0 +1,253 @@
+import io
+import os
+import shutil
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def load_data(**options):
+    call_command('load_data_from_csv', stdout=io.StringIO(), **options)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10LoadData:
+
+    def test_01_dependency_levels(self):
+        from reviews.management.commands.load_data_from_csv import (
+            TABLES, dependency_levels)
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title, User)
+
+        levels = [set(level) for level in dependency_levels(TABLES)]
+        assert levels == [
+            {User, Category, Genre}, {Title}, {Review, GenreTitle}, {Comment}
+        ], (
+            'Проверьте, что таблицы загружаются уровнями графа внешних '
+            'ключей: каждая таблица после тех, на которые она ссылается.'
+        )
+
+    def test_02_load_data(self):
+        from reviews.models import Comment, Review, Title
+
+        load_data(batch_size=10)
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert Title.objects.get(pk=1).rating == 10, (
+            'Проверьте, что после загрузки csv пересчитываются рейтинги '
+            'произведений.'
+        )
+
+    def test_03_upsert(self, tmp_path):
+        from reviews.models import Category, Title
+
+        load_data()
+        for name in os.listdir(DATA_DIR):
+            shutil.copy(os.path.join(DATA_DIR, name), tmp_path)
+        path = tmp_path / 'category.csv'
+        path.write_text(
+            path.read_text(encoding='utf8').replace(
+                '2,Книга,book', '2,Книги,book'
+            ).rstrip('\n') + '\n4,Сериал,series\n',
+            encoding='utf8'
+        )
+
+        output = io.StringIO()
+        call_command(
+            'load_data_from_csv', data_dir=tmp_path, upsert=True,
+            stdout=output
+        )
+        assert 'category.csv: 1 rows created, 1 updated' in (
+            output.getvalue()
+        ), (
+            'Проверьте, что в режиме `--upsert` создаются только новые '
+            'строки и обновляются только изменившиеся.'
+        )
+        assert 'review.csv: 0 rows created, 0 updated' in output.getvalue()
+        assert Category.objects.get(slug='book').name == 'Книги'
+        assert Category.objects.filter(slug='series').exists()
+        assert Title.objects.get(pk=1).rating == 10
+
+    def test_04_fast_load(self):
+        from reviews.models import Category, Comment, Review, Title, User
+
+        load_data(fast=True, batch_size=10)
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert Category.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        pub_date = review.pub_date.isoformat()
+        assert pub_date == '2019-09-24T21:08:21.567000+00:00', (
+            'Проверьте, что в режиме `--fast` дата публикации отзыва '
+            'берётся из csv.'
+        )
+        assert review.author_id == 100
+        assert Title.objects.get(pk=1).category_id == 1
+        assert Title.objects.get(pk=1).rating == 10
+        user = User.objects.get(pk=100)
+        assert user.is_active and user.bio == '', (
+            'Проверьте, что в режиме `--fast` поля, которых нет в csv, '
+            'получают значения по умолчанию.'
+        )
+
+    def test_05_durability_relaxed_only_for_fast(self, monkeypatch):
+        from contextlib import contextmanager
+
+        from reviews.management.commands import load_data_from_csv
+
+        calls = []
+
+        @contextmanager
+        def relaxed_durability():
+            calls.append(True)
+            yield
+
+        monkeypatch.setattr(
+            load_data_from_csv, 'relaxed_durability', relaxed_durability
+        )
+        load_data()
+        load_data(upsert=True)
+        assert not calls, (
+            'Проверьте, что обычная загрузка и `--upsert` не ослабляют '
+            'гарантии сохранности SQLite.'
+        )
+        call_command('flush', interactive=False, verbosity=0)
+        load_data(fast=True)
+        assert calls == [True], (
+            'Проверьте, что гарантии сохранности ослабляются в режиме '
+            '`--fast`.'
+        )
+
+    def parallel_loader(self, output):
+        from django.core.management.base import OutputWrapper
+        from reviews.management.commands.load_data_from_csv import (INSERT,
+                                                                    Command)
+
+        command = Command()
+        command.stdout = OutputWrapper(output)
+        command.verbosity = 1
+        command.data_dir = DATA_DIR
+        command.batch_size = 10
+        command.mode = INSERT
+        command.changed = 0
+        command.title_ids = set()
+        return command
+
+    def test_06_load_parallel(self):
+        from reviews.management.commands.load_data_from_csv import (
+            TABLES, dependency_levels)
+        from reviews.models import Comment, GenreTitle, Review
+
+        output = io.StringIO()
+        # Один поток: SQLite допускает одного писателя, но пачки всё равно
+        # проходят через пул и ограничение очереди.
+        self.parallel_loader(output).load_parallel(
+            dependency_levels(TABLES), 1
+        )
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert 'review.csv: 72 rows created' in output.getvalue(), (
+            'Проверьте, что параллельная загрузка суммирует результаты '
+            'пачек по таблицам.'
+        )
+        assert f'genre_title.csv: {GenreTitle.objects.count()} rows' in (
+            output.getvalue()
+        )
+
+    def test_07_failed_batch_aborts_parallel_load(self, monkeypatch):
+        from django.core.management import CommandError
+        from reviews.management.commands import load_data_from_csv
+        from reviews.models import Comment, Review, Title
+
+        save_chunk = load_data_from_csv.save_chunk
+
+        def failing_save_chunk(model, rows, mode):
+            if model is Review:
+                raise ValueError('broken batch')
+            return save_chunk(model, rows, mode)
+
+        monkeypatch.setattr(
+            load_data_from_csv, 'save_chunk', failing_save_chunk
+        )
+        with pytest.raises(CommandError, match='broken batch'):
+            self.parallel_loader(io.StringIO()).load_parallel(
+                load_data_from_csv.dependency_levels(
+                    load_data_from_csv.TABLES
+                ),
+                1,
+            )
+        assert Title.objects.exists()
+        assert not Review.objects.exists() and not Comment.objects.exists(), (
+            'Проверьте, что ошибка одной пачки прерывает загрузку: '
+            'следующие таблицы не загружаются.'
+        )
+
+    def test_08_upsert_touches_only_delta(self, tmp_path):
+        import csv
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.generations import get_generations
+        from reviews.models import Title
+
+        load_data()
+        epoch = get_generations(())[0]
+        with CaptureQueriesContext(connection) as context:
+            load_data(upsert=True)
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].split()[0] in ('INSERT', 'UPDATE', 'DELETE')
+        ]
+        assert not writes and get_generations(())[0] == epoch, (
+            'Проверьте, что `--upsert` без изменений в csv ничего не '
+            'пишет в базу и не сбрасывает кэши.'
+        )
+
+        for name in os.listdir(DATA_DIR):
+            shutil.copy(os.path.join(DATA_DIR, name), tmp_path)
+        path = tmp_path / 'review.csv'
+        with open(path, encoding='utf8', newline='') as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        rows[0]['score'] = '4'
+        with open(path, 'w', encoding='utf8', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        other = Title.objects.get(pk=2)
+        with CaptureQueriesContext(connection) as context:
+            load_data(data_dir=tmp_path, upsert=True)
+        title = Title.objects.get(pk=int(rows[0]['title_id']))
+        assert title.rating == 7, (
+            'Проверьте, что `--upsert` пересчитывает рейтинг произведения '
+            'с изменившимся отзывом.'
+        )
+        assert Title.objects.get(pk=2).rating == other.rating
+        assert not any(
+            query['sql'].startswith('DELETE FROM "reviews_titlestats"')
+            and 'WHERE' not in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что `--upsert` пересчитывает только изменённые.'
+        assert get_generations(())[0] > epoch
+
+    def test_09_modes_store_same_rows(self):
+        from reviews.models import Comment, Review
+
+        saved = {}
+        for mode in ('insert', 'fast', 'upsert'):
+            call_command('flush', interactive=False, verbosity=0)
+            load_data(**{mode: True} if mode != 'insert' else {})
+            saved[mode] = [
+                list(model.objects.order_by('pk').values())
+                for model in (Review, Comment)
+            ]
+        assert saved['insert'] == saved['fast'] == saved['upsert'], (
+            'Проверьте, что обычная загрузка, `--fast` и `--upsert` '
+            'сохраняют одинаковые строки, включая даты публикации из csv.'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.isoformat() == (
+            '2019-09-24T21:08:21.567000+00:00'
+        )
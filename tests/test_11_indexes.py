@@ -0,0 +1,142 @@
+import pytest
+from django.db import connection
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Планы запросов проверяются на SQLite'
+)
+@pytest.mark.django_db(transaction=True)
+class Test11Indexes:
+
+    def test_01_review_feed_index(self):
+        from reviews.models import Review
+
+        plan = Review.objects.filter(title_id=1)[:10].explain()
+        assert 'review_title_pub_date_idx' in plan, (
+            'Проверьте, что лента отзывов произведения использует составной '
+            'индекс (title, -pub_date, -id).'
+        )
+        assert 'TEMP B-TREE' not in plan, (
+            'Проверьте, что лента отзывов не сортируется отдельно от индекса.'
+        )
+
+    def test_02_comment_feed_index(self):
+        from reviews.models import Comment
+
+        plan = Comment.objects.filter(review_id=1)[:10].explain()
+        assert 'comment_review_pub_date_idx' in plan, (
+            'Проверьте, что лента комментариев отзыва использует составной '
+            'индекс (review, pub_date, id).'
+        )
+        assert 'TEMP B-TREE' not in plan
+
+    def test_03_title_filter_indexes(self):
+        from reviews.models import Title
+
+        plan = Title.objects.filter(category_id=1, year=2000).explain()
+        assert 'title_category_year_idx (category_id=? AND year=?)' in plan, (
+            'Проверьте, что фильтр произведений по категории и году '
+            'использует индекс (category, year).'
+        )
+        plan = Title.objects.filter(year=2000).explain()
+        assert 'title_year_id_idx' in plan, (
+            'Проверьте, что фильтр произведений по году использует индекс.'
+        )
+
+    def test_04_genre_filter_index(self):
+        from reviews.models import GenreTitle, Title
+
+        plan = Title.objects.filter(genre__slug='drama').explain()
+        assert 'reviews_genretitle USING COVERING INDEX' in plan, (
+            'Проверьте, что фильтр произведений по жанру читает связи '
+            'жанр-произведение из уникального индекса (genre, title).'
+        )
+        assert 'unique_genre_title' in [
+            constraint.name for constraint in GenreTitle._meta.constraints
+        ]
+
+    def test_05_title_ordering_indexes(self):
+        from api.filters import TitleFilter
+        from reviews.models import Title
+
+        ordering_filter = TitleFilter.base_filters['ordering']
+        for ordering, index in (
+            ('name', 'title_name_id_idx'),
+            ('-year', 'title_year_id_idx'),
+            ('rating', 'title_rating_id_idx'),
+            ('-rating', 'title_rating_id_idx'),
+            ('review_count', 'title_rating_count_id_idx'),
+        ):
+            plan = ordering_filter.filter(
+                Title.objects.select_related('category'), [ordering]
+            )[:10].explain()
+            assert index in plan and 'TEMP B-TREE' not in plan, (
+                'Проверьте, что сортировка списка произведений по '
+                f'{ordering} читает строки из индекса {index}, а не '
+                'сортирует выборку.'
+            )
+
+    def test_06_fts_triggers_restored_after_migrate(self):
+        from django.core.management import call_command
+        from reviews.models import Title
+        from reviews.search import search_titles
+
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER reviews_title_fts_insert')
+        Title.objects.create(name='Потерянный триггер', year=2000)
+        call_command('migrate', verbosity=0)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                "AND name = 'reviews_title_fts_insert'"
+            )
+            assert cursor.fetchone(), (
+                'Проверьте, что после migrate триггеры полнотекстовой '
+                'таблицы пересоздаются.'
+            )
+        Title.objects.create(name='Новый триггер', year=2000)
+        names = {
+            title.name
+            for title in search_titles(Title.objects.all(), 'триггер')
+        }
+        assert names == {'Потерянный триггер', 'Новый триггер'}, (
+            'Проверьте, что таблица FTS5 перестраивается, если изменения '
+            'прошли без триггеров.'
+        )
+
+    def test_07_missing_tokenizer_falls_back(self, monkeypatch):
+        from reviews import fts, search
+        from reviews.models import Title
+
+        assert fts.supports_tokenizer(connection, 'trigram')
+        assert not fts.supports_tokenizer(connection, 'no_such_tokenizer')
+
+        with connection.schema_editor() as schema_editor:
+            fts.drop_fts_tables('reviews_title')(None, schema_editor)
+        monkeypatch.setitem(
+            fts.FTS_TABLES, 'reviews_title', ('name', 'no_such_tokenizer')
+        )
+        with connection.schema_editor() as schema_editor:
+            fts.create_fts_tables('reviews_title')(None, schema_editor)
+        search._fts_available.clear()
+        assert 'reviews_title_fts' not in (
+            connection.introspection.table_names()
+        ), (
+            'Проверьте, что без нужного токенизатора миграция не создаёт '
+            'таблицу FTS5.'
+        )
+        Title.objects.create(name='Без триграмм', year=2000)
+        names = [
+            title.name
+            for title in search.search_titles(Title.objects.all(), 'триграмм')
+        ]
+        assert names == ['Без триграмм'], (
+            'Проверьте, что без таблицы FTS5 поиск по названию работает '
+            'через icontains.'
+        )
+        monkeypatch.undo()
+        with connection.schema_editor() as schema_editor:
+            fts.create_fts_tables('reviews_title')(None, schema_editor)
+        search._fts_available.clear()
+
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+URL = '/api/v1/autocomplete/'
+
+
+@pytest.fixture
+def autocomplete_index():
+    from reviews.autocomplete import autocomplete_index
+
+    autocomplete_index.rebuild()
+    yield autocomplete_index
+    if autocomplete_index.thread is not None:
+        autocomplete_index.thread.join()
+    autocomplete_index.reset()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12Autocomplete:
+
+    def test_01_autocomplete(self, client, admin_client,
+                             autocomplete_index):
+        titles, categories, genres = create_titles(admin_client)
+        name = titles[0]['name']
+
+        response = client.get(URL, {'q': name[:3].upper()})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{URL}` возвращает ответ со статусом 200.'
+        )
+        assert {'type': 'title', 'id': titles[0]['id'], 'name': name,
+                'slug': None} in response.json(), (
+            f'Проверьте, что `{URL}` находит произведение по префиксу '
+            'названия без учёта регистра.'
+        )
+
+        response = client.get(
+            URL, {'q': genres[0]['name'][:2], 'type': 'genre'}
+        )
+        data = response.json()
+        assert data and all(item['type'] == 'genre' for item in data), (
+            f'Проверьте, что параметр `type` эндпоинта `{URL}` ограничивает '
+            'подсказки одним видом объектов.'
+        )
+        assert genres[0]['slug'] in [item['slug'] for item in data]
+
+    def test_02_autocomplete_follows_changes(self, client, admin_client,
+                                             autocomplete_index,
+                                             django_assert_num_queries):
+        from reviews.models import Genre
+
+        for name in ('Драма', 'Детектив', 'Документальный', 'Мюзикл'):
+            Genre.objects.create(name=name, slug=name.lower())
+        response = client.get(URL, {'q': 'д', 'limit': 2})
+        assert [item['name'] for item in response.json()] == [
+            'Детектив', 'Документальный'
+        ], (
+            f'Проверьте, что `{URL}` возвращает первые по алфавиту `limit` '
+            'подсказок.'
+        )
+
+        genre = Genre.objects.get(name='Мюзикл')
+        genre.name = 'Дорама'
+        genre.save()
+        Genre.objects.get(name='Детектив').delete()
+        with django_assert_num_queries(0):
+            response = client.get(URL, {'q': 'до'})
+        assert [item['name'] for item in response.json()] == [
+            'Документальный', 'Дорама'
+        ], (
+            f'Проверьте, что индекс `{URL}` обновляется при изменении и '
+            'удалении объектов и отвечает без запросов к базе.'
+        )
+
+        response = client.get(URL, {'q': 'до', 'limit': 1000})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(URL)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что запрос к `{URL}` без параметра `q` возвращает '
+            'ответ со статусом 400.'
+        )
+
+    def test_03_index_built_in_background(self, client, autocomplete_index,
+                                          django_assert_num_queries):
+        from reviews.models import Genre
+
+        autocomplete_index.reset()
+        Genre.objects.create(name='Драма', slug='drama')
+        with django_assert_num_queries(0):
+            response = client.get(URL, {'q': 'д'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [], (
+            f'Проверьте, что `{URL}` не ждёт построения индекса по базе и '
+            'до его готовности возвращает пустой список.'
+        )
+        Genre.objects.create(name='Детектив', slug='detective')
+        autocomplete_index.thread.join()
+        response = client.get(URL, {'q': 'д'})
+        assert [item['name'] for item in response.json()] == [
+            'Детектив', 'Драма'
+        ], (
+            f'Проверьте, что индекс `{URL}` строится в фоновом потоке и '
+            'учитывает изменения, сохранённые во время построения.'
+        )
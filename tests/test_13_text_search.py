@@ -0,0 +1,137 @@
+import io
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+URL = '/api/v1/search/{kind}/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TextSearch:
+
+    @pytest.fixture
+    def reviews(self, admin, user, moderator):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Война и мир', year=1869)
+        other = Title.objects.create(name='Анна Каренина', year=1878)
+        return [
+            Review.objects.create(
+                title=title, author=admin, score=9,
+                text='Великий роман о войне и мире, финал потрясает'
+            ),
+            Review.objects.create(
+                title=title, author=user, score=4,
+                text='Слишком длинный роман, финал затянут'
+            ),
+            Review.objects.create(
+                title=other, author=moderator, score=7,
+                text='Трагический роман о любви'
+            ),
+        ]
+
+    def test_01_search_reviews(self, client, reviews):
+        url = URL.format(kind='reviews')
+        response = client.get(url, {'q': 'роман финал'})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{url}` возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert {item['id'] for item in data['results']} == {
+            reviews[0].id, reviews[1].id
+        }, (
+            f'Проверьте, что `{url}` возвращает отзывы, содержащие все '
+            'слова запроса.'
+        )
+        assert all(
+            '<mark>финал</mark>' in item['highlight']
+            and 'relevance' in item
+            for item in data['results']
+        ), (
+            f'Проверьте, что `{url}` подсвечивает найденные слова и '
+            'возвращает релевантность.'
+        )
+
+        response = client.get(
+            url, {'q': 'роман', 'score_min': 5, 'score_max': 8}
+        )
+        assert [item['id'] for item in response.json()['results']] == [
+            reviews[2].id
+        ], f'Проверьте фильтрацию `{url}` по диапазону оценок.'
+        response = client.get(
+            url, {'q': 'роман', 'title': reviews[0].title_id,
+                  'author': reviews[1].author.username}
+        )
+        assert [item['id'] for item in response.json()['results']] == [
+            reviews[1].id
+        ], f'Проверьте фильтрацию `{url}` по произведению и автору.'
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что запрос к `{url}` без параметра `q` возвращает '
+            'ответ со статусом 400.'
+        )
+
+    def test_02_index_follows_changes(self, client, reviews, admin):
+        from reviews.models import Comment
+
+        review = reviews[2]
+        review.text = 'Роман о железной дороге'
+        review.save()
+        reviews[0].delete()
+        Comment.objects.create(
+            review=reviews[1], author=admin, text='Согласен, финал затянут'
+        )
+        response = client.get(URL.format(kind='reviews'), {'q': 'финал'})
+        assert [item['id'] for item in response.json()['results']] == [
+            reviews[1].id
+        ], (
+            'Проверьте, что индекс поиска обновляется при изменении и '
+            'удалении отзывов.'
+        )
+        response = client.get(URL.format(kind='reviews'), {'q': 'любви'})
+        assert response.json()['count'] == 0
+
+        response = client.get(
+            URL.format(kind='comments'),
+            {'q': 'затянут', 'title': reviews[1].title_id}
+        )
+        data = response.json()['results']
+        assert len(data) == 1 and data[0]['review'] == reviews[1].id, (
+            'Проверьте, что `/api/v1/search/comments/` находит комментарии '
+            'по тексту.'
+        )
+
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        response = client.get(URL.format(kind='reviews'), {'q': 'дороге'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что после перестроения индекса поиск продолжает '
+            'работать.'
+        )
+
+    def test_03_highlight_escapes_text(self, client, admin):
+        from reviews.models import Comment, Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=admin, score=5,
+            text='<script>alert(1)</script> роман & <b>финал</b>'
+        )
+        Comment.objects.create(
+            review=review, author=admin, text='<img src=x onerror=alert(1)>'
+        )
+        for kind, query, fragment in (
+            ('reviews', 'роман', '&lt;script&gt;alert(1)&lt;/script&gt; '
+                                 '<mark>роман</mark> &amp; &lt;b&gt;'),
+            ('comments', 'onerror', '&lt;img src=x '),
+        ):
+            highlight = client.get(
+                URL.format(kind=kind), {'q': query}
+            ).json()['results'][0]['highlight']
+            tags = highlight.replace('<mark>', '').replace('</mark>', '')
+            assert fragment in highlight and '<' not in tags, (
+                f'Проверьте, что `{URL.format(kind=kind)}` экранирует текст '
+                'перед подсветкой найденных слов.'
+            )
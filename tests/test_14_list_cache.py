@@ -0,0 +1,81 @@
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_genre, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ListCache:
+
+    def test_01_genre_list_cache(self, client, admin_client,
+                                 django_assert_num_queries):
+        genres = create_genre(admin_client)
+        url = '/api/v1/genres/'
+
+        client.get(url)
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.json()['count'] == len(genres), (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из кэша '
+            'без запросов к базе.'
+        )
+        with django_assert_num_queries(2):
+            client.get(f'{url}?limit=1')
+
+        admin_client.post(url, data={'name': 'Мюзикл', 'slug': 'musical'})
+        response = client.get(url)
+        assert response.json()['count'] == len(genres) + 1, (
+            f'Проверьте, что запись через API сбрасывает кэш списка `{url}`.'
+        )
+        admin_client.delete(f'{url}musical/')
+        assert client.get(url).json()['count'] == len(genres)
+
+    def test_02_title_list_follows_reviews(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        title_id = titles[0]['id']
+
+        response = client.get(f'{url}?year={titles[0]["year"]}')
+        assert response.json()['results'][0]['rating'] is None
+        admin_client.post(
+            f'{url}{title_id}/reviews/', data={'text': 'text', 'score': 7}
+        )
+        response = client.get(f'{url}?year={titles[0]["year"]}')
+        assert response.json()['results'][0]['rating'] == 7, (
+            f'Проверьте, что кэш списка `{url}` сбрасывается при изменении '
+            'отзывов, влияющих на рейтинг.'
+        )
+
+    def test_03_loader_invalidates_cache(self, client):
+        url = '/api/v1/categories/'
+        assert client.get(url).json()['count'] == 0
+        call_command('load_data_from_csv', stdout=io.StringIO())
+        assert client.get(url).json()['count'] == 3, (
+            'Проверьте, что загрузка csv сбрасывает кэш списков.'
+        )
+
+    def test_04_other_process_invalidates_cache(self, client):
+        url = '/api/v1/titles/'
+        etag = client.get(url)['ETag']
+        subprocess.run(
+            [
+                sys.executable, '-c',
+                'import django; django.setup(); '
+                'from reviews.generations import bump_epoch; bump_epoch()',
+            ],
+            cwd=os.path.join(os.path.dirname(os.path.dirname(
+                os.path.abspath(__file__)
+            )), 'api_yamdb'),
+            check=True,
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что смена поколения в другом процессе, например в '
+            'команде загрузки csv, сбрасывает кэш сервера: кэш по '
+            'умолчанию должен быть общим для процессов.'
+        )
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    def test_01_titles_etag(self, client, admin_client,
+                            django_assert_num_queries):
+        titles, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        response = client.get(url)
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ `{url}` содержит заголовки `ETag` и '
+            '`Last-Modified`.'
+        )
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с совпадающим '
+            '`If-None-Match` возвращает ответ со статусом 304 без запросов '
+            'к базе.'
+        )
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        response = client.get(f'{url}?limit=1', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag зависит от параметров запроса.'
+        )
+        admin_client.patch(
+            f'{url}{titles[0]["id"]}/', data={'name': 'Новое название'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения произведения ETag `{url}` '
+            'меняется.'
+        )
+
+    def test_02_reviews_and_comments_etag(self, client, admin_client, admin,
+                                          user_client, user,
+                                          moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        detail_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        detail_etag = client.get(detail_url)['ETag']
+
+        user_client.post(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            data={'text': 'text', 'score': 5}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что отзыв к другому произведению не меняет ETag '
+            f'`{url}`.'
+        )
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        review_url = f'{url}{reviews[0]["id"]}/'
+        admin_client.patch(
+            review_url, data={'text': 'new text'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что изменение отзыва меняет ETag `{url}`.'
+        )
+
+        comments_url = f'{review_url}comments/'
+        etag = client.get(comments_url)['ETag']
+        admin_client.post(comments_url, data={'text': 'comment'})
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag '
+            f'`{comments_url}`.'
+        )
+        assert len(response.json()['results']) == 1
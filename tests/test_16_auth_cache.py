@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16AuthCache:
+
+    def test_01_user_cached_between_requests(self, user_client,
+                                             django_assert_num_queries):
+        url = '/api/v1/genres/'
+        user_client.get(url)
+        with django_assert_num_queries(0):
+            response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь с JWT-токеном загружается из кэша, '
+            'а не из базы на каждом запросе.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, admin_client,
+                                              moderator_client, moderator):
+        url = '/api/v1/users/'
+        response = moderator_client.get(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        admin_client.patch(f'{url}{moderator.username}/', data={
+            'role': 'admin'
+        })
+        response = moderator_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение роли пользователя сбрасывает его '
+            'запись в кэше аутентификации.'
+        )
+
+        admin_client.delete(f'{url}{moderator.username}/')
+        response = moderator_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удалённый пользователь не аутентифицируется '
+            'по записи из кэша.'
+        )
+
+    def test_03_confirmation_code_used_once(self, user):
+        from api.confirmation import mark_used
+        from reviews.models import UsedConfirmationCode
+
+        assert mark_used('signature', 60)
+        assert not mark_used('signature', 60), (
+            'Проверьте, что подпись использованного кода подтверждения '
+            'принимается только один раз.'
+        )
+        UsedConfirmationCode.objects.update(expires='2000-01-01T00:00Z')
+        assert mark_used('other', 60)
+        assert list(
+            UsedConfirmationCode.objects.values_list('signature', flat=True)
+        ) == ['other'], (
+            'Проверьте, что записи с истёкшим сроком удаляются.'
+        )
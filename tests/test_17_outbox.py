@@ -0,0 +1,98 @@
+import io
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+def send_outbox(**options):
+    output = io.StringIO()
+    call_command('send_outbox', stdout=output, **options)
+    return output.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Outbox:
+
+    def test_01_signup_enqueues_email(self, client):
+        from reviews.models import OutgoingEmail
+
+        outbox_before = len(mail.outbox)
+        client.post('/api/v1/auth/signup/', data={
+            'email': 'outbox@yamdb.fake', 'username': 'outbox'
+        })
+        assert len(mail.outbox) == outbox_before, (
+            'Проверьте, что регистрация не отправляет письмо в запросе, а '
+            'ставит его в очередь.'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipient='outbox@yamdb.fake', sent_at__isnull=True
+        ).exists()
+
+        assert 'Emails sent: 1, failed: 0' in send_outbox()
+        assert mail.outbox[-1].to == ['outbox@yamdb.fake']
+        assert 'Emails sent: 0, failed: 0' in send_outbox(), (
+            'Проверьте, что отправленное письмо не отправляется повторно.'
+        )
+
+    def test_02_batches_and_retries(self):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import enqueue_email
+
+        for idx in range(5):
+            enqueue_email('Тема', 'Текст', f'user_{idx}@yamdb.fake')
+        outbox_before = len(mail.outbox)
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.open'
+        ) as open_connection:
+            assert 'Emails sent: 5' in send_outbox(batch_size=2)
+        assert open_connection.call_count == 1, (
+            'Проверьте, что все пачки писем отправляются через одно '
+            'соединение.'
+        )
+        assert len(mail.outbox) == outbox_before + 5
+
+        email = enqueue_email('Тема', 'Текст', 'broken@yamdb.fake')
+        with mock.patch(
+            'django.core.mail.EmailMessage.send',
+            side_effect=ConnectionError('SMTP unavailable')
+        ):
+            assert 'Emails sent: 0, failed: 1' in send_outbox()
+        email = OutgoingEmail.objects.get(pk=email.pk)
+        assert email.attempts == 1 and email.sent_at is None
+        assert email.last_error == 'SMTP unavailable'
+        assert 'Emails sent: 0, failed: 0' in send_outbox(), (
+            'Проверьте, что письмо с ошибкой откладывается до следующей '
+            'попытки.'
+        )
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            next_attempt_at=email.created
+        )
+        assert 'Emails sent: 1, failed: 0' in send_outbox(), (
+            'Проверьте, что письмо с ошибкой отправляется повторно.'
+        )
+
+    def test_03_send_outside_transaction(self):
+        from django.db import connection
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import enqueue_email, send_batch
+
+        email = enqueue_email('Тема', 'Текст', 'lease@yamdb.fake')
+        during_send = []
+
+        def send(message):
+            during_send.append((connection.in_atomic_block, send_batch()))
+            return 1
+
+        with mock.patch(
+            'django.core.mail.EmailMessage.send', autospec=True,
+            side_effect=send
+        ):
+            assert send_batch() == (1, 0)
+        assert during_send == [(False, (0, 0))], (
+            'Проверьте, что письма отправляются вне транзакции, а захваченное '
+            'письмо не берёт другой обработчик.'
+        )
+        email = OutgoingEmail.objects.get(pk=email.pk)
+        assert email.attempts == 1 and email.sent_at is not None
@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def user_filter(settings):
+    from reviews.bloom import user_filter
+
+    settings.USER_FILTER = True
+    user_filter.reset()
+    yield user_filter
+    if user_filter.thread is not None:
+        user_filter.thread.join()
+    user_filter.reset()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18UserFilter:
+    url = '/api/v1/auth/signup/'
+
+    def test_01_new_user_skips_lookup(self, client, user_filter):
+        user_filter.rebuild()
+        data = {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert not any(
+            query['sql'].startswith('SELECT')
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что при включённом фильтре регистрация нового '
+            'пользователя не ищет имя и почту в базе.'
+        )
+        assert user_filter.may_exist('newcomer', 'other@yamdb.fake'), (
+            'Проверьте, что новый пользователь добавляется в фильтр.'
+        )
+
+        response = client.post(self.url, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == 'Код подтверждения обновлён'
+        response = client.post(
+            self.url,
+            data={'username': 'newcomer', 'email': 'other@yamdb.fake'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'username' in response.json()
+
+    def test_02_stale_filter_falls_back_to_database(self, client, user,
+                                                    user_filter):
+        from reviews.bloom import BloomFilter
+
+        user_filter.bloom = BloomFilter(1024, 0.01)
+        assert not user_filter.may_exist(user.username, user.email)
+        response = client.post(
+            self.url, data={'username': user.username, 'email': user.email}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что пользователь, которого нет в фильтре, получает '
+            'новый код после проверки по базе.'
+        )
+        assert response.json() == 'Код подтверждения обновлён'
+        response = client.post(
+            self.url,
+            data={'username': user.username, 'email': 'other@yamdb.fake'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_rebuild_command(self, user, settings, tmp_path,
+                                user_filter, capsys):
+        from reviews.bloom import BloomFilter
+
+        path = tmp_path / 'users.bloom'
+        settings.USER_FILTER_PATH = str(path)
+        call_command('rebuild_user_filter')
+        output = capsys.readouterr().out
+        assert 'memory:' in output, (
+            'Проверьте, что команда rebuild_user_filter сообщает размер '
+            'фильтра в памяти.'
+        )
+        bloom = BloomFilter.load(path)
+        assert bloom.count == 2
+        assert bloom.might_contain(f'u:{user.username}')
+        assert bloom.might_contain(f'e:{user.email}')
+
+        user_filter.reset()
+        with CaptureQueriesContext(connection) as context:
+            user_filter.load()
+        assert user_filter.bloom.bits == bloom.bits, (
+            'Проверьте, что фильтр загружается из файла USER_FILTER_PATH.'
+        )
+        assert not context.captured_queries
+
+    def test_04_missing_filter_built_in_background(self, user, user_filter):
+        with CaptureQueriesContext(connection) as context:
+            assert user_filter.may_exist('newcomer', 'newcomer@yamdb.fake')
+        assert not context.captured_queries, (
+            'Проверьте, что без фильтра регистрация не ждёт его построения '
+            'по базе, а проверяет имя и почту запросом.'
+        )
+        user_filter.thread.join()
+        assert user_filter.may_exist(user.username, user.email), (
+            'Проверьте, что фильтр строится по базе в фоновом потоке.'
+        )
+        assert not user_filter.may_exist('newcomer', 'newcomer@yamdb.fake')
+
+    def test_05_overflow_rebuilds_in_background(self, user, user_filter):
+        from reviews.bloom import BloomFilter
+
+        user_filter.bloom = BloomFilter(1, 0.01)
+        user_filter.add('first', 'first@yamdb.fake')
+        user_filter.add('second', 'second@yamdb.fake')
+        assert user_filter.may_exist('newcomer', 'newcomer@yamdb.fake'), (
+            'Проверьте, что после переполнения фильтра проверка идёт по '
+            'базе до его перестроения.'
+        )
+        user_filter.thread.join()
+        assert user_filter.bloom.capacity > 1, (
+            'Проверьте, что переполненный фильтр перестраивается в фоне.'
+        )
+        assert user_filter.may_exist(user.username, user.email)
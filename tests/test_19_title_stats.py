@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleStats:
+
+    def check_stats(self, client, title_id, scores):
+        response = client.get(f'/api/v1/titles/{title_id}/stats/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/{id}/stats/` '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        histogram = {str(score): 0 for score in range(1, 11)}
+        for score in scores:
+            histogram[str(score)] += 1
+        assert data['histogram'] == histogram, (
+            'Проверьте, что распределение оценок произведения обновляется '
+            'при создании, изменении и удалении отзывов.'
+        )
+        assert data['count'] == len(scores)
+        return data
+
+    def test_01_stats_follow_reviews(self, client, admin_client, admin,
+                                     user, user_client, moderator_client):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        scores = [review['score'] for review in reviews]
+        data = self.check_stats(client, titles[0]['id'], scores)
+
+        response = moderator_client.post(url, data={'text': 'a', 'score': 9})
+        review_id = response.json()['id']
+        scores.append(9)
+        self.check_stats(client, titles[0]['id'], scores)
+
+        moderator_client.patch(f'{url}{review_id}/', data={'score': 2})
+        scores[-1] = 2
+        self.check_stats(client, titles[0]['id'], scores)
+
+        moderator_client.delete(f'{url}{review_id}/')
+        scores.pop()
+        data = self.check_stats(client, titles[0]['id'], scores)
+        assert data['mean'] == pytest.approx(sum(scores) / len(scores))
+
+    def test_02_stats_values(self, client, django_user_model):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000)
+        empty = Title.objects.create(name='Без отзывов', year=2000)
+        scores = [10, 3, 7, 7]
+        for idx, score in enumerate(scores):
+            author = django_user_model.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='text', score=score
+            )
+        call_command('rebuild_title_stats')
+        data = self.check_stats(client, title.id, scores)
+        assert data['mean'] == pytest.approx(6.75)
+        assert data['median'] == 7, (
+            'Проверьте, что медиана считается по распределению оценок.'
+        )
+
+        data = self.check_stats(client, empty.id, [])
+        assert data['mean'] is None and data['median'] is None
+
+        response = client.get('/api/v1/titles/999/stats/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_concurrent_first_review(self, user, admin):
+        from unittest import mock
+
+        from reviews import ratings
+        from reviews.models import Review, Title, TitleStats
+
+        title = Title.objects.create(name='Гонка', year=2000)
+        Review.objects.create(title=title, author=admin, text='a', score=3)
+        TitleStats.objects.filter(title=title).delete()
+        Review.objects.create(title=title, author=user, text='a', score=8)
+        histogram = ratings.title_histogram
+
+        def created_concurrently(title_id):
+            # Параллельная транзакция успела создать строку со своим отзывом.
+            TitleStats.objects.create(title_id=title_id, score_3=1)
+            return histogram(title_id)
+
+        with mock.patch.object(
+            ratings, 'title_histogram', side_effect=created_concurrently
+        ):
+            ratings.update_title_stats(title.id, added=8)
+        stats = TitleStats.objects.get(title=title)
+        assert (stats.score_3, stats.score_8) == (1, 1), (
+            'Проверьте, что строка статистики, созданная параллельной '
+            'транзакцией, получает изменение, а не вызывает ошибку.'
+        )
+
+        TitleStats.objects.filter(title=title).delete()
+        ratings.update_title_stats(title.id, added=8)
+        stats = TitleStats.objects.get(title=title)
+        assert (stats.score_3, stats.score_8) == (1, 1), (
+            'Проверьте, что отсутствующая строка статистики создаётся по '
+            'отзывам произведения.'
+        )
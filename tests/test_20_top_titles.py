@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TopTitles:
+    url = '/api/v1/titles/top/'
+
+    @pytest.fixture
+    def ranked(self, django_user_model):
+        from reviews.models import Category, Genre, Review, Title
+
+        books = Category.objects.create(name='Книги', slug='books')
+        films = Category.objects.create(name='Фильмы', slug='films')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        single = Title.objects.create(name='Один отзыв', year=2000,
+                                      category=books)
+        popular = Title.objects.create(name='Популярное', year=2000,
+                                       category=books)
+        weak = Title.objects.create(name='Слабое', year=2000,
+                                    category=films)
+        Title.objects.create(name='Без отзывов', year=2000, category=films)
+        single.genre.set([drama])
+        popular.genre.set([drama, comedy])
+        weak.genre.set([comedy])
+        authors = [
+            django_user_model.objects.create(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(20)
+        ]
+        Review.objects.create(
+            title=single, author=authors[0], text='text', score=10
+        )
+        for author in authors:
+            Review.objects.create(
+                title=popular, author=author, text='text', score=9
+            )
+            Review.objects.create(
+                title=weak, author=author, text='text', score=2
+            )
+        call_command('rebuild_title_ratings')
+        call_command('rank_titles')
+        return single, popular, weak
+
+    def get_ids(self, client, query=''):
+        response = client.get(f'{self.url}{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/top/` возвращает '
+            'ответ со статусом 200.'
+        )
+        return [title['id'] for title in response.json()]
+
+    def test_01_weighted_order(self, client, ranked):
+        single, popular, weak = ranked
+        response = client.get(self.url)
+        data = response.json()
+        assert [title['id'] for title in data] == [
+            popular.id, single.id, weak.id
+        ], (
+            'Проверьте, что рейтинг лучших упорядочен по взвешенному '
+            'рейтингу: произведение с одним отзывом не должно обходить '
+            'хорошо оценённое многими, а произведения без отзывов в рейтинг '
+            'не попадают.'
+        )
+        assert [title['position'] for title in data] == [1, 2, 3]
+        single.refresh_from_db()
+        assert data[1]['weighted_rating'] == pytest.approx(
+            single.weighted_rating
+        )
+        assert single.rating > single.weighted_rating, (
+            'Проверьте, что взвешенный рейтинг приближает оценки '
+            'произведения с малым числом отзывов к среднему.'
+        )
+        assert self.get_ids(client, '?limit=1') == [popular.id]
+
+    def test_02_scoped_rankings(self, client, ranked):
+        single, popular, weak = ranked
+        assert self.get_ids(client, '?category=books') == [
+            popular.id, single.id
+        ], 'Проверьте фильтрацию рейтинга лучших по категории.'
+        assert self.get_ids(client, '?genre=comedy') == [
+            popular.id, weak.id
+        ], 'Проверьте фильтрацию рейтинга лучших по жанру.'
+        assert self.get_ids(client, '?category=films&genre=comedy') == [
+            weak.id
+        ], 'Проверьте фильтрацию рейтинга лучших по категории и жанру.'
+        assert self.get_ids(client, '?genre=unknown') == []
+        response = client.get(f'{self.url}?limit=0')
+        assert response.status_code == HTTPStatus.BAD_REQUEST